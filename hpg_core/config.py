@@ -103,6 +103,10 @@ SECTION_ENERGY_THRESHOLD = 0.3  # Novelty-Peak Threshold fuer Sektions-Erkennung
 BPM_HALF_DOUBLE_ENABLED = True  # 140 BPM ↔ 70 BPM als kompatibel erkennen
 BPM_HALF_DOUBLE_PENALTY = 0.85  # Leichter Abzug fuer Half/Double Transitions (0-1)
 
+# === Set Timing ===
+SET_PEAK_ENERGY_WEIGHT = 0.6  # Gewicht der Track-Energie im Peak-Score
+SET_PEAK_POSITION_WEIGHT = 0.4  # Gewicht der Naehe zur Ziel-Peak-Position
+
 # === Logging & Debugging ===
 LOG_LEVEL = "INFO"  # Standard-Level: DEBUG, INFO, WARNING, ERROR
 LOG_TO_FILE = True  # Logdatei unter logs/hpg.log (mit Rotation)
@@ -12,17 +12,32 @@ from .config import (
     GENRE_WEIGHT_WITHOUT_DJ_BRAIN,
     BPM_HALF_DOUBLE_ENABLED,
     BPM_HALF_DOUBLE_PENALTY,
+    SET_PEAK_ENERGY_WEIGHT,
+    SET_PEAK_POSITION_WEIGHT,
 )
+import functools
 import logging
 import re
 import random
 import math
+import warnings
+from collections import Counter
+import numpy as np
+from scipy.cluster.vq import kmeans2
 from typing import List, Tuple, Dict, Optional
 from dataclasses import dataclass
-from enum import Enum
+from enum import Enum, StrEnum
 
 logger = logging.getLogger(__name__)
 
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logger.info("numba nicht installiert. MFCC-Distanz laeuft ueber NumPy.")
+
 
 @dataclass
 class TransitionMetrics:
@@ -1500,7 +1515,25 @@ def benchmark_algorithms(
 # === Set-Timing / Time-based Planning ===
 
 
-@dataclass
+class EnergyPhase(StrEnum):
+    """Energy-Phase eines Tracks in der Set-Timeline.
+
+    StrEnum: Mitglieder sind echte Strings ("peak" == EnergyPhase.PEAK),
+    daher bleiben Dict-Lookups in theme.PHASE_COLORS/PHASE_LABELS gueltig.
+    """
+
+    INTRO = "intro"
+    BUILD = "build"
+    PEAK = "peak"
+    SUSTAIN = "sustain"
+    COOLDOWN = "cooldown"
+
+
+# Fester Index je Phase (Deklarationsreihenfolge), z.B. fuer np.bincount
+_PHASE_INDEX: dict[EnergyPhase, int] = {phase: i for i, phase in enumerate(EnergyPhase)}
+
+
+@dataclass(slots=True, frozen=True)
 class SetTimeline:
     """Zeitplanung fuer ein DJ-Set."""
 
@@ -1511,7 +1544,7 @@ class SetTimeline:
     overflow_minutes: float  # Ueberschuss/Defizit in Minuten
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SetTimelineEntry:
     """Ein Track-Eintrag in der Set-Timeline."""
 
@@ -1521,100 +1554,137 @@ class SetTimelineEntry:
     playing_duration: float  # Effektive Spieldauer in Sekunden
     overlap_with_next: float  # Overlap in Sekunden zum naechsten Track
     is_peak: bool  # Ist dieser Track am Peak-Punkt?
-    energy_phase: str  # "intro", "build", "peak", "sustain", "cooldown"
+    energy_phase: EnergyPhase  # intro, build, peak, sustain, cooldown
 
 
 def _calculate_timeline_entries(
-    tracks: list[Track], default_overlap: float
-) -> tuple[list[SetTimelineEntry], float]:
-    """Berechnet Start- und Endzeiten fuer jeden Track."""
-    entries: list[SetTimelineEntry] = []
-    current_time = 0.0
-
-    for i, track in enumerate(tracks):
-        track_dur = max(track.duration, 30.0)  # Minimum 30s pro Track
-
-        # Overlap zum naechsten Track berechnen
-        if i < len(tracks) - 1:
-            # Nutze Mix-Points wenn vorhanden, sonst Default
-            mix_out = (
-                track.mix_out_point if track.mix_out_point > 0 else track_dur * 0.85
-            )
-            overlap = track_dur - mix_out
-            overlap = max(4.0, min(overlap, default_overlap, track_dur * 0.3))
-        else:
-            overlap = 0.0  # Letzter Track hat keinen Overlap
-
-        playing_duration = track_dur - overlap
-        end_time = current_time + playing_duration
-
-        entries.append(
-            SetTimelineEntry(
-                track=track,
-                start_time=round(current_time, 2),
-                end_time=round(end_time, 2),
-                playing_duration=round(playing_duration, 2),
-                overlap_with_next=round(overlap, 2),
-                is_peak=False,  # Wird spaeter gesetzt
-                energy_phase="build",  # Wird spaeter gesetzt
-            )
+    track_keys: tuple[tuple[float, float, float], ...], default_overlap: float
+) -> tuple[list[tuple[float, float, float, float]], float]:
+    """Berechnet Start- und Endzeiten fuer jeden Track.
+
+    Returns:
+      Liste von (start_time, end_time, playing_duration, overlap_with_next)
+      und die Gesamtdauer in Sekunden.
+    """
+    n = len(track_keys)
+    if n == 0:
+        return [], 0.0
+
+    keys = np.asarray(track_keys, dtype=np.float64)
+    durations = np.maximum(keys[:, 0], 30.0)  # Minimum 30s pro Track
+    mix_out_points = keys[:, 1]
+
+    # Overlap zum naechsten Track: Mix-Points wenn vorhanden, sonst Default
+    mix_out = np.where(mix_out_points > 0, mix_out_points, durations * 0.85)
+    overlaps = np.maximum(
+        4.0, np.minimum(np.minimum(durations - mix_out, default_overlap), durations * 0.3)
+    )
+    overlaps[-1] = 0.0  # Letzter Track hat keinen Overlap
+
+    # cumsum summiert sequentiell -> identische Zeiten wie die fruehere Schleife
+    playing = durations - overlaps
+    ends = np.cumsum(playing)
+    starts = np.concatenate(([0.0], ends[:-1]))
+
+    # Python-round statt np.round: gleiche Rundung wie bisher (z.B. bei x.xx5)
+    times = [
+        (round(start, 2), round(end, 2), round(play, 2), round(ov, 2))
+        for start, end, play, ov in zip(
+            starts.tolist(), ends.tolist(), playing.tolist(), overlaps.tolist()
         )
+    ]
+    return times, float(ends[-1])
 
-        current_time = end_time
 
-    return entries, current_time
+def _peak_scores(
+    times: list[tuple[float, float, float, float]],
+    energies: list[float],
+    total_seconds: float,
+    peak_position_pct: float,
+) -> np.ndarray:
+    """Peak-Score je Track.
+
+    score[i] = w_e * energy[i] / 100 + w_p * (1 - |mid[i] - peak_time| / total)
+    """
+    # Einmal in Arrays, dann alle Scores in einem Durchgang
+    bounds = np.asarray(times, dtype=np.float64)
+    energy_arr = np.fromiter(energies, dtype=np.float64, count=len(energies))
+
+    peak_time = total_seconds * peak_position_pct
+    mids = (bounds[:, 0] + bounds[:, 1]) / 2.0
+    time_factor = 1.0 - np.minimum(
+        np.abs(mids - peak_time) / max(total_seconds, 1.0), 1.0
+    )
+    return (
+        (energy_arr / 100.0) * SET_PEAK_ENERGY_WEIGHT
+        + time_factor * SET_PEAK_POSITION_WEIGHT
+    )
 
 
 def _identify_peak_track(
-    entries: list[SetTimelineEntry], total_seconds: float, peak_position_pct: float
+    times: list[tuple[float, float, float, float]],
+    energies: list[float],
+    total_seconds: float,
+    peak_position_pct: float,
 ) -> int:
-    """Findet den Index des Peak-Tracks."""
-    if not entries:
+    """Findet den Index des Peak-Tracks (Maximum von _peak_scores)."""
+    if not times:
         return 0
 
-    peak_time = total_seconds * peak_position_pct
-    best_peak_idx = 0
-    best_peak_score = -1.0
-
-    for i, entry in enumerate(entries):
-        mid = (entry.start_time + entry.end_time) / 2.0
-        # Score: Energie * (1 - Abstand zum Peak-Zeitpunkt)
-        time_factor = 1.0 - min(abs(mid - peak_time) / max(total_seconds, 1.0), 1.0)
-        energy_factor = entry.track.energy / 100.0
-        score = energy_factor * 0.6 + time_factor * 0.4
-        if score > best_peak_score:
-            best_peak_score = score
-            best_peak_idx = i
+    scores = _peak_scores(times, energies, total_seconds, peak_position_pct)
+    # argmax liefert bei Gleichstand den ersten Track (wie bisher)
+    return int(np.argmax(scores))
 
-    entries[best_peak_idx].is_peak = True
-    return best_peak_idx
 
-
-def _assign_energy_phases(entries: list[SetTimelineEntry], best_peak_idx: int) -> None:
+def _assign_energy_phases(n: int, best_peak_idx: int) -> list[EnergyPhase]:
     """Weist jedem Track eine Energy-Phase zu."""
-    n = len(entries)
+    phases: list[EnergyPhase] = []
     if n == 0:
-        return
+        return phases
 
     peak_pos = best_peak_idx / max(n - 1, 1)
-    for i, entry in enumerate(entries):
+    for i in range(n):
         relative_pos = i / max(n - 1, 1)
-        if entry.is_peak:
-            entry.energy_phase = "peak"
+        if i == best_peak_idx:
+            phases.append(EnergyPhase.PEAK)
         elif i == 0:
-            entry.energy_phase = "intro"
+            phases.append(EnergyPhase.INTRO)
         elif i == n - 1:
-            entry.energy_phase = "cooldown"
+            phases.append(EnergyPhase.COOLDOWN)
         elif relative_pos < peak_pos * 0.5:
-            entry.energy_phase = "build"
+            phases.append(EnergyPhase.BUILD)
         elif relative_pos <= peak_pos:
-            entry.energy_phase = "build"
+            phases.append(EnergyPhase.BUILD)
         elif relative_pos <= peak_pos + 0.15:
-            entry.energy_phase = "sustain"
+            phases.append(EnergyPhase.SUSTAIN)
         elif relative_pos > peak_pos + 0.15:
-            entry.energy_phase = "cooldown"
+            phases.append(EnergyPhase.COOLDOWN)
         else:
-            entry.energy_phase = "build"
+            phases.append(EnergyPhase.BUILD)
+    return phases
+
+
+@functools.lru_cache(maxsize=64)
+def _compute_timeline_layout(
+    track_keys: tuple[tuple[float, float, float], ...],
+    peak_position_pct: float,
+    default_overlap: float,
+) -> tuple[
+    tuple[tuple[float, float, float, float], ...], float, int, tuple[EnergyPhase, ...]
+]:
+    """Gecachter Kern von compute_set_timeline.
+
+    Haengt nur von (duration, mix_out_point, energy) je Track ab, daher
+    reicht ein Tupel aus Primitiven als Key. Das Ergebnis ist unveraenderlich;
+    die SetTimelineEntry-Objekte baut der Aufrufer jedes Mal neu.
+    """
+    times, total_seconds = _calculate_timeline_entries(track_keys, default_overlap)
+    energies = [energy for _, _, energy in track_keys]
+    best_peak_idx = _identify_peak_track(
+        times, energies, total_seconds, peak_position_pct
+    )
+    phases = _assign_energy_phases(len(times), best_peak_idx)
+    return tuple(times), total_seconds, best_peak_idx, tuple(phases)
 
 
 def compute_set_timeline(
@@ -1649,9 +1719,27 @@ def compute_set_timeline(
 
     peak_position_pct = max(0.1, min(0.9, peak_position_pct))
 
-    entries, total_seconds = _calculate_timeline_entries(tracks, default_overlap)
-    best_peak_idx = _identify_peak_track(entries, total_seconds, peak_position_pct)
-    _assign_energy_phases(entries, best_peak_idx)
+    # Track-Objekte sind nicht hashbar -> Key aus den relevanten Primitiven
+    track_keys = tuple((t.duration, t.mix_out_point, t.energy) for t in tracks)
+    times, total_seconds, best_peak_idx, phases = _compute_timeline_layout(
+        track_keys, peak_position_pct, default_overlap
+    )
+
+    # Frische Entries pro Aufruf, damit entry.track auf die uebergebenen Tracks zeigt
+    entries = [
+        SetTimelineEntry(
+            track=track,
+            start_time=start_time,
+            end_time=end_time,
+            playing_duration=playing_duration,
+            overlap_with_next=overlap,
+            is_peak=i == best_peak_idx,
+            energy_phase=phases[i],
+        )
+        for i, (track, (start_time, end_time, playing_duration, overlap)) in enumerate(
+            zip(tracks, times)
+        )
+    ]
 
     total_minutes = total_seconds / 60.0
     peak_minutes = entries[best_peak_idx].start_time / 60.0 if entries else 0.0
@@ -1703,10 +1791,17 @@ def get_set_timing_summary(timeline: SetTimeline) -> dict:
     peak_track_name = peak_entry.track.title if peak_entry else "?"
     peak_time = _fmt(peak_entry.start_time) if peak_entry else "0:00"
 
-    # Phasen-Breakdown
-    phases: dict[str, int] = {}
-    for entry in timeline.entries:
-        phases[entry.energy_phase] = phases.get(entry.energy_phase, 0) + 1
+    # Phasen-Breakdown: Zaehlung per bincount ueber die Phasen-Indizes,
+    # Ausgabe in der festen Reihenfolge intro -> build -> peak -> sustain -> cooldown
+    phase_ids = np.fromiter(
+        (_PHASE_INDEX[e.energy_phase] for e in timeline.entries),
+        dtype=np.intp,
+        count=len(timeline.entries),
+    )
+    counts = np.bincount(phase_ids, minlength=len(_PHASE_INDEX))
+    phases: dict[str, int] = {
+        str(phase): int(counts[i]) for phase, i in _PHASE_INDEX.items() if counts[i]
+    }
 
     # Durchschnittliche Track-Dauer
     durations = [e.playing_duration for e in timeline.entries]
@@ -1728,6 +1823,35 @@ def get_set_timing_summary(timeline: SetTimeline) -> dict:
 # === Similarity Clustering (MFCC-basiert) ===
 
 
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True, fastmath=True)
+    def _mfcc_dist_nb(a, b):
+        """Skalare Distanz-Schleife; bei 13 Dimensionen schneller als NumPy-Dispatch."""
+        s = 0.0
+        for k in range(a.shape[0]):
+            d = a[k] - b[k]
+            s += d * d
+        return np.sqrt(s)
+
+    @njit(cache=True, fastmath=True)
+    def _mfcc_dist13_nb(a, b):
+        """Variante fuer den Standardfall n_mfcc=13.
+
+        Die feste Schleifenlaenge erlaubt LLVM, komplett zu entrollen und zu vektorisieren.
+        """
+        s = 0.0
+        for k in range(13):
+            d = a[k] - b[k]
+            s += d * d
+        return np.sqrt(s)
+
+
+def _mfcc_len(fp) -> int:
+    """Laenge eines MFCC-Fingerprints; None (Alt-Cache) zaehlt als leer."""
+    return 0 if fp is None else len(fp)
+
+
 def mfcc_distance(fp1: list, fp2: list) -> float:
     """Berechnet euklidische Distanz zwischen zwei MFCC-Fingerprints.
 
@@ -1739,12 +1863,24 @@ def mfcc_distance(fp1: list, fp2: list) -> float:
         Euklidische Distanz. 0.0 = identisch. Groesser = unaehnlicher.
         Gibt float('inf') zurueck wenn ein Fingerprint leer ist.
     """
-    if not fp1 or not fp2:
+    if _mfcc_len(fp1) == 0 or _mfcc_len(fp2) == 0:
         return float("inf")
     if len(fp1) != len(fp2):
         return float("inf")
+    if fp1 is fp2:
+        # Gleiches Objekt (z.B. Track gegen sich selbst): keine Rechnung noetig
+        return 0.0
 
-    return math.sqrt(sum((a - b) ** 2 for a, b in zip(fp1, fp2)))
+    a = np.asarray(fp1, dtype=np.float64)
+    b = np.asarray(fp2, dtype=np.float64)
+    if NUMBA_AVAILABLE:
+        if a.shape[0] == 13:
+            return float(_mfcc_dist13_nb(a, b))
+        return float(_mfcc_dist_nb(a, b))
+
+    # Fallback ohne numba: Differenz einmal bilden, Skalarprodukt statt Python-Schleife
+    diff = a - b
+    return math.sqrt(float(diff @ diff))
 
 
 def find_similar_tracks(
@@ -1764,22 +1900,46 @@ def find_similar_tracks(
     Returns:
         Liste von (Track, Distanz) Tupeln, sortiert nach Aehnlichkeit (kleinste Distanz zuerst).
     """
-    if not reference.mfcc_fingerprint:
+    ref_fp = reference.mfcc_fingerprint
+    if _mfcc_len(ref_fp) == 0:
         return []
 
-    scored = []
-    for track in candidates:
-        if track is reference:
-            continue
-        dist = mfcc_distance(reference.mfcc_fingerprint, track.mfcc_fingerprint)
-        if dist == float("inf"):
-            continue
-        if max_distance is not None and dist > max_distance:
-            continue
-        scored.append((track, dist))
+    # Nur Kandidaten mit passender Dimension (alle anderen haetten Distanz inf)
+    dim = len(ref_fp)
+    valid = [
+        t for t in candidates
+        if t is not reference and _mfcc_len(t.mfcc_fingerprint) == dim
+    ]
+    if not valid:
+        return []
 
-    scored.sort(key=lambda x: x[1])
-    return scored[:max_results]
+    # Alle Distanzen in einem Durchgang ueber die Differenzmatrix. Die Expansion
+    # ||a||^2 + ||b||^2 - 2 a.b ist hier ungeeignet: bei MFCC-c0 um -100..-600
+    # loescht sie sich aus (Duplikate landen bei ~1e-5 statt 0).
+    # Filter und Sortierung laufen auf quadrierten Distanzen (sqrt ist monoton);
+    # die Wurzel wird nur fuer die zurueckgegebenen Treffer gezogen.
+    matrix = np.asarray([t.mfcc_fingerprint for t in valid], dtype=np.float64)
+    diff = matrix - np.asarray(ref_fp, dtype=np.float64)
+    sq_dists = np.einsum("ij,ij->i", diff, diff)
+
+    idx = np.arange(len(valid))
+    if max_distance is not None:
+        if max_distance < 0:
+            return []
+        idx = idx[sq_dists <= max_distance * max_distance]
+
+    # Top-k in O(N): k-ten Wert per partition bestimmen, nur Kandidaten bis
+    # einschliesslich dieses Werts behalten (in Kandidaten-Reihenfolge). Die
+    # stabile Sortierung dieser kleinen Menge haelt Gleichstaende an der
+    # k-ten Position deterministisch (argpartition waehlt dort beliebig).
+    d = sq_dists[idx]
+    if 0 < max_results < len(idx):
+        kth = np.partition(d, max_results - 1)[max_results - 1]
+        keep = d <= kth
+        idx, d = idx[keep], d[keep]
+    order = idx[np.argsort(d, kind="stable")]
+
+    return [(valid[i], math.sqrt(sq_dists[i])) for i in order[:max_results]]
 
 
 def cluster_tracks_by_similarity(
@@ -1789,7 +1949,7 @@ def cluster_tracks_by_similarity(
 ) -> list[list[Track]]:
     """Gruppiert Tracks in Cluster basierend auf MFCC-Aehnlichkeit (k-Means).
 
-    Einfacher k-Means Algorithmus ohne externe Dependencies (kein sklearn noetig).
+    k-Means ueber scipy.cluster.vq.kmeans2 (kein sklearn noetig).
 
     Args:
         tracks: Liste von Tracks mit MFCC-Fingerprints
@@ -1797,15 +1957,19 @@ def cluster_tracks_by_similarity(
         max_iterations: Maximale Iterationen
 
     Returns:
-        Liste von Track-Listen (Cluster). Tracks ohne MFCC landen in einem Extra-Cluster.
+        Liste von Track-Listen (Cluster). Tracks ohne MFCC (oder mit abweichender
+        MFCC-Dimension) landen in einem Extra-Cluster.
     """
-    # Trenne Tracks mit/ohne MFCC
-    with_mfcc = [
-        t for t in tracks if t.mfcc_fingerprint and len(t.mfcc_fingerprint) > 0
-    ]
-    without_mfcc = [
-        t for t in tracks if not t.mfcc_fingerprint or len(t.mfcc_fingerprint) == 0
-    ]
+    # Geclustert werden nur Tracks mit der haeufigsten MFCC-Dimension (wie bei
+    # find_similar_tracks); abweichende Laengen landen bei den Tracks ohne MFCC
+    lengths = [_mfcc_len(t.mfcc_fingerprint) for t in tracks]
+    dim_counts = Counter(n for n in lengths if n > 0)
+    dim = dim_counts.most_common(1)[0][0] if dim_counts else 0
+
+    with_mfcc: list[Track] = []
+    without_mfcc: list[Track] = []
+    for t, n in zip(tracks, lengths):
+        (with_mfcc if n > 0 and n == dim else without_mfcc).append(t)
 
     if len(with_mfcc) <= n_clusters:
         # Zu wenige Tracks — jeder Track ist sein eigenes Cluster
@@ -1815,38 +1979,23 @@ def cluster_tracks_by_similarity(
         return clusters
 
     # k-Means: Initialisierung mit gleichmaessig verteilten Tracks
+    # (deterministisch, gleiche Eingabe -> gleiche Cluster)
+    data = np.asarray([t.mfcc_fingerprint for t in with_mfcc], dtype=np.float64)
     step = len(with_mfcc) // n_clusters
-    centroids = [list(with_mfcc[i * step].mfcc_fingerprint) for i in range(n_clusters)]
-
-    assignments = [0] * len(with_mfcc)
-
-    for _ in range(max_iterations):
-        # Assign: Jeden Track dem naechsten Centroid zuweisen
-        new_assignments = []
-        for track in with_mfcc:
-            dists = [mfcc_distance(track.mfcc_fingerprint, c) for c in centroids]
-            new_assignments.append(dists.index(min(dists)))
-
-        # Konvergenz-Check
-        if new_assignments == assignments:
-            break
-        assignments = new_assignments
-
-        # Update: Centroids neu berechnen
-        dim = len(centroids[0])
-        cluster_to_members = [[] for _ in range(n_clusters)]
-        for i, k_idx in enumerate(assignments):
-            cluster_to_members[k_idx].append(with_mfcc[i])
-
-        for k in range(n_clusters):
-            members = cluster_to_members[k]
-            if not members:
-                continue
-            new_centroid = [0.0] * dim
-            for m in members:
-                for d in range(dim):
-                    new_centroid[d] += m.mfcc_fingerprint[d]
-            centroids[k] = [v / len(members) for v in new_centroid]
+    init = data[[i * step for i in range(n_clusters)]].copy()
+
+    # Assign/Update-Schleife laeuft in scipy (C) statt in Python.
+    # Leere Cluster behalten ihren alten Centroid und werden unten verworfen:
+    # nur diese erwartete Meldung filtern. Kein catch_warnings() (tauscht die
+    # globale Filterliste, nicht thread-sicher); pro Aufruf statt beim Import,
+    # weil ein Import-Filter in einem umgebenden catch_warnings() verloren geht.
+    warnings.filterwarnings(
+        "ignore", message="One of the clusters is empty", category=UserWarning
+    )
+    _, labels = kmeans2(
+        data, init, iter=max_iterations, minit="matrix", missing="warn"
+    )
+    assignments = labels.tolist()
 
     # Cluster zusammenbauen
     clusters = [[] for _ in range(n_clusters)]
@@ -1879,11 +2028,11 @@ def get_cluster_summary(clusters: list[list[Track]]) -> list[dict]:
 
         bpms = [t.bpm for t in cluster if t.bpm > 0]
         energies = [t.energy for t in cluster if t.energy > 0]
-        genres = {}
+        genres: Counter[str] = Counter()
         for t in cluster:
             g = t.detected_genre if t.detected_genre != "Unknown" else t.genre
             if g and g != "Unknown":
-                genres[g] = genres.get(g, 0) + 1
+                genres[g] += 1
 
         summary = {
             "cluster_id": i,
@@ -1893,7 +2042,8 @@ def get_cluster_summary(clusters: list[list[Track]]) -> list[dict]:
                 (round(min(bpms), 1), round(max(bpms), 1)) if bpms else (0.0, 0.0)
             ),
             "avg_energy": round(sum(energies) / len(energies), 1) if energies else 0.0,
-            "top_genres": sorted(genres.items(), key=lambda x: -x[1])[:3],
+            # most_common ist stabil: bei Gleichstand gilt die Reihenfolge im Cluster
+            "top_genres": genres.most_common(3),
             "tracks": [t.title for t in cluster[:5]],  # Erste 5 Titel als Preview
         }
         summaries.append(summary)
@@ -20,15 +20,28 @@ Algorithm:
 
 from __future__ import annotations
 
+import functools
 import logging
+import math
 from dataclasses import dataclass, field, asdict
 import numpy as np
 import librosa
+import scipy.fft
+from scipy.signal import find_peaks
+from numpy.lib.stride_tricks import sliding_window_view
 
 from .config import HOP_LENGTH, METER, SECTION_ENERGY_THRESHOLD
 
 logger = logging.getLogger(__name__)
 
+try:
+  from numba import njit
+
+  NUMBA_AVAILABLE = True
+except ImportError:
+  NUMBA_AVAILABLE = False
+  logger.info("numba nicht installiert. Novelty-Kernel laeuft ueber NumPy.")
+
 
 # === Data Structures ===
 
@@ -57,6 +70,46 @@ class TrackStructure:
   phrase_unit: int = 8  # 8, 16, or 32 bars
 
 
+@dataclass(frozen=True)
+class _BarGrid:
+  """Bar grid of a track at constant BPM (METER beats per bar)."""
+  seconds_per_bar: float
+  total_bars: int
+  duration: float
+
+  @classmethod
+  def from_bpm(cls, bpm: float, duration: float) -> _BarGrid:
+    seconds_per_bar = 60.0 / bpm * METER
+    return cls(seconds_per_bar, int(duration / seconds_per_bar), duration)
+
+  def time_to_bar(self, times) -> np.ndarray:
+    """Nearest bar index for each time (half-to-even like round()) as int32."""
+    return np.rint(np.asarray(times, dtype=np.float64) / self.seconds_per_bar).astype(np.int32)
+
+  def quantize(self, times) -> list[float]:
+    """
+    Snap boundary times to the bar grid in one pass.
+
+    Rounds to the nearest bar, clamps to the track, sorts + dedupes and
+    enforces a minimum spacing of 2 bars. Accepts lists or arrays.
+    """
+    if len(times) == 0:
+      return [0.0]
+
+    bar_index = self.time_to_bar(times)
+    quantized = np.unique(np.clip(bar_index * self.seconds_per_bar, 0.0, self.duration))
+
+    # Ensure minimum spacing of 2 bars (greedy from the left, inherently sequential;
+    # runs over the few deduplicated values only)
+    min_spacing = self.seconds_per_bar * 2
+    filtered = [float(quantized[0])]
+    for t in quantized[1:].tolist():
+      if t - filtered[-1] >= min_spacing:
+        filtered.append(t)
+
+    return filtered
+
+
 # === Genre-specific Phrase Units ===
 
 GENRE_PHRASE_UNITS: dict[str, int] = {
@@ -87,8 +140,128 @@ ENERGY_BUILD_THRESHOLD = 0.9    # 60-90% with rising trend = build
 ENERGY_BREAKDOWN_THRESHOLD = 0.8  # Sudden drop after high = breakdown
 
 
+# Peak-to-peak below this = flat/silent audio, no structure to detect
+FLAT_AUDIO_PTP = 1e-3
+
+# FFT size for the MFCC front end (librosa default)
+MFCC_N_FFT = 2048
+# Audio per STFT block in the MFCC front end (bounds peak memory on long tracks)
+MFCC_BLOCK_SECONDS = 30.0
+
+
 # === Core Analysis Functions ===
 
+@functools.lru_cache(maxsize=8)
+def _mfcc_workspace(sr: int, n_fft: int) -> tuple[np.ndarray, np.ndarray]:
+  """
+  Cached STFT window and mel filterbank for a (sr, n_fft) pair.
+
+  Built once per sample rate instead of on every librosa.feature.mfcc() call.
+  Arrays are read-only because they are shared between calls.
+  """
+  window = librosa.filters.get_window("hann", n_fft, fftbins=True).astype(np.float32)
+  mel_basis = librosa.filters.mel(sr=sr, n_fft=n_fft).astype(np.float32)
+  window.flags.writeable = False
+  mel_basis.flags.writeable = False
+  return window, mel_basis
+
+
+def _compute_mfcc(
+  y: np.ndarray,
+  sr: int,
+  hop_length: int,
+  n_mfcc: int = 13,
+  block_seconds: float = MFCC_BLOCK_SECONDS,
+) -> np.ndarray:
+  """
+  MFCCs equivalent to librosa.feature.mfcc(y=y, sr=sr, n_mfcc=n_mfcc, hop_length=hop_length).
+
+  Frames the zero-padded signal as a strided view (no per-frame copies),
+  applies the cached window and runs the real FFT block by block. Only the
+  mel spectrogram is kept for the whole track, so peak memory for the
+  windowed frames and the complex spectrum is bounded by block_seconds
+  instead of the track length. Frames are independent, results are identical.
+  """
+  window, mel_basis = _mfcc_workspace(sr, MFCC_N_FFT)
+
+  # center=True, pad_mode="constant" wie librosa.stft
+  padded = np.pad(y, MFCC_N_FFT // 2)
+  frames = sliding_window_view(padded, MFCC_N_FFT)[::hop_length]
+  n_frames = frames.shape[0]
+  block_frames = max(1, int(block_seconds * sr / hop_length))
+
+  mel = np.empty((mel_basis.shape[0], n_frames), dtype=np.float32)
+  for start in range(0, n_frames, block_frames):
+    stop = min(start + block_frames, n_frames)
+    spectrum = scipy.fft.rfft(frames[start:stop] * window, axis=-1)
+    power = (spectrum.real ** 2 + spectrum.imag ** 2).T
+    mel[:, start:stop] = mel_basis @ power
+
+  return librosa.feature.mfcc(S=librosa.power_to_db(mel), n_mfcc=n_mfcc)
+
+
+def _checkerboard_novelty(rec: np.ndarray, kernel_size: int) -> np.ndarray:
+  """
+  Checkerboard kernel along the SSM diagonal (NumPy fallback).
+
+  Only the band of rec around the diagonal is read: row window sums come
+  from a cumulative sum over that band, the block sums from gathering k of
+  those window sums per frame. O(n * k) instead of O(n * k^2), without an
+  n x n temporary. Only used when numba is missing; results must match
+  _checkerboard_novelty_nb.
+  """
+  n = rec.shape[0]
+  k = kernel_size
+  novelty = np.zeros(n)
+  if n - k <= k:
+    return novelty
+
+  # band[r, j] = rec[r, r - k + j] for j in [0, 3k), ausserhalb der Matrix 0
+  rows = np.arange(n)[:, None]
+  cols = rows + np.arange(-k, 2 * k)[None, :]
+  valid = (cols >= 0) & (cols < n)
+  band = np.where(valid, rec[rows, np.clip(cols, 0, n - 1)], 0.0)
+
+  # window[r, j] = sum(rec[r, c:c + k]) fuer Spalte c = r - k + j, j in [0, 2k]
+  csum = np.zeros((n, 3 * k + 1))
+  np.cumsum(band, axis=1, out=csum[:, 1:])
+  window = csum[:, k:] - csum[:, :2 * k + 1]
+
+  # Blocksummen: Zeilen [c, c + k) bzw. [c - k, c) in Spalte c aufsummieren
+  i = np.arange(k, n - k)
+  d = np.arange(k)
+  diag_sum = window[np.arange(n - k)[:, None] + d, k - d].sum(axis=1)  # c in [0, n - k)
+  cross = window[i[:, None] - 1 - d, k + 1 + d].sum(axis=1)
+
+  # Compare blocks before and after the current frame
+  norm = 1.0 / (k * k)
+  self_sim = (diag_sum[i - k] + diag_sum[i]) * norm / 2.0
+  novelty[i] = np.maximum(0.0, self_sim - cross * norm)
+  return novelty
+
+
+if NUMBA_AVAILABLE:
+
+  @njit(cache=True, fastmath=True)
+  def _checkerboard_novelty_nb(rec, kernel_size):
+    """Same as _checkerboard_novelty, as one compiled loop without block temporaries."""
+    n = rec.shape[0]
+    novelty = np.zeros(n)
+    norm = 1.0 / (kernel_size * kernel_size)
+    for i in range(kernel_size, n - kernel_size):
+      before = 0.0
+      after = 0.0
+      cross = 0.0
+      for a in range(kernel_size):
+        for b in range(kernel_size):
+          before += rec[i - kernel_size + a, i - kernel_size + b]
+          after += rec[i + a, i + b]
+          cross += rec[i - kernel_size + a, i + b]
+      self_sim = (before + after) * norm / 2.0
+      novelty[i] = max(0.0, self_sim - cross * norm)
+    return novelty
+
+
 def _compute_novelty_curve(y: np.ndarray, sr: int, hop_length: int = HOP_LENGTH) -> tuple[np.ndarray, np.ndarray]:
   """
   Compute a novelty curve from MFCC-based self-similarity.
@@ -105,7 +278,7 @@ def _compute_novelty_curve(y: np.ndarray, sr: int, hop_length: int = HOP_LENGTH)
     (novelty_curve, times) - novelty values and their timestamps
   """
   # Extract MFCCs (13 coefficients, standard for music)
-  mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13, hop_length=hop_length)
+  mfcc = _compute_mfcc(y, sr, hop_length, n_mfcc=13)
 
   # Check for minimum MFCC length (needs at least 10 frames for recurrence matrix)
   num_frames = mfcc.shape[1]
@@ -136,21 +309,13 @@ def _compute_novelty_curve(y: np.ndarray, sr: int, hop_length: int = HOP_LENGTH)
 
   # Compute novelty from the recurrence matrix
   # Novelty is high where the local structure changes
-  novelty = np.zeros(rec.shape[0])
   kernel_size = int(sr / hop_length * 2)  # ~2 second kernel
   kernel_size = max(4, kernel_size)
 
-  # Checkerboard kernel for novelty detection
-  for i in range(kernel_size, rec.shape[0] - kernel_size):
-    # Compare blocks before and after the current frame
-    block_before = rec[i - kernel_size:i, i - kernel_size:i]
-    block_after = rec[i:i + kernel_size, i:i + kernel_size]
-    block_cross = rec[i - kernel_size:i, i:i + kernel_size]
-
-    if block_before.size > 0 and block_after.size > 0 and block_cross.size > 0:
-      self_sim = (np.mean(block_before) + np.mean(block_after)) / 2.0
-      cross_sim = np.mean(block_cross)
-      novelty[i] = max(0.0, self_sim - cross_sim)
+  if NUMBA_AVAILABLE:
+    novelty = _checkerboard_novelty_nb(np.ascontiguousarray(rec), kernel_size)
+  else:
+    novelty = _checkerboard_novelty(rec, kernel_size)
 
   # Smooth the novelty curve
   if len(novelty) > 8:
@@ -204,31 +369,24 @@ def _pick_boundaries(
   threshold = SECTION_ENERGY_THRESHOLD
   boundaries = []
 
+  max_peaks = max(1, max_sections - 1)
+
   while threshold >= 0.1 and len(boundaries) < MIN_SECTIONS - 1:
-    peaks = []
-    for i in range(1, len(novelty_norm) - 1):
-      if novelty_norm[i] > novelty_norm[i - 1] and novelty_norm[i] > novelty_norm[i + 1]:
-        if novelty_norm[i] >= threshold:
-          peaks.append((i, novelty_norm[i]))
-
-    # Sort by strength (descending)
-    peaks.sort(key=lambda x: x[1], reverse=True)
-
-    # Apply minimum distance constraint
-    selected = []
-    for idx, strength in peaks:
-      too_close = False
-      for sel_idx in selected:
-        if abs(idx - sel_idx) < min_distance_frames:
-          too_close = True
-          break
-      if not too_close:
-        selected.append(idx)
-
-      if len(selected) >= max_sections - 1:
-        break
-
-    boundaries = sorted([times[idx] for idx in selected])
+    # Strikte lokale Maxima (plateau_size=1) ueber dem Threshold; find_peaks
+    # verwirft dabei staerkere-zuerst alle Peaks naeher als min_distance_frames
+    peaks, props = find_peaks(
+      novelty_norm,
+      height=threshold,
+      distance=min_distance_frames,
+      plateau_size=(1, 1),
+    )
+
+    # Nur die staerksten Peaks behalten
+    if len(peaks) > max_peaks:
+      strongest = np.argsort(-props["peak_heights"], kind="stable")[:max_peaks]
+      peaks = peaks[strongest]
+
+    boundaries = sorted(times[peaks].tolist())
     threshold -= 0.05
 
   # Always include 0.0 as the first boundary
@@ -261,30 +419,12 @@ def _quantize_to_bars(
   if bpm <= 0:
     return boundaries
 
-  seconds_per_beat = 60.0 / bpm
-  seconds_per_bar = seconds_per_beat * METER
+  return _BarGrid.from_bpm(bpm, duration).quantize(boundaries)
 
-  quantized = []
-  for t in boundaries:
-    # Quantize to nearest bar
-    bar_index = round(t / seconds_per_bar)
-    quantized_time = bar_index * seconds_per_bar
 
-    # Clamp to track bounds
-    quantized_time = max(0.0, min(quantized_time, duration))
-    quantized.append(quantized_time)
-
-  # Remove duplicates and sort
-  quantized = sorted(set(quantized))
-
-  # Ensure minimum spacing of 2 bars
-  min_spacing = seconds_per_bar * 2
-  filtered = [quantized[0]] if quantized else [0.0]
-  for t in quantized[1:]:
-    if t - filtered[-1] >= min_spacing:
-      filtered.append(t)
-
-  return filtered
+def _rms_to_energy(rms):
+  """Scale RMS to 0-100 (typical audio RMS is 0.0 to ~0.4). Works on scalars and arrays."""
+  return np.clip(np.interp(rms, [0.0, 0.4], [0.0, 100.0]), 0.0, 100.0)
 
 
 def _compute_section_energy(y: np.ndarray, sr: int, start: float, end: float) -> float:
@@ -308,13 +448,94 @@ def _compute_section_energy(y: np.ndarray, sr: int, start: float, end: float) ->
   end_sample = max(start_sample + 1, min(end_sample, len(y)))
 
   segment = y[start_sample:end_sample]
-  if len(segment) == 0:
+  n = len(segment)
+  if n == 0:
     return 0.0
 
-  rms = float(np.sqrt(np.mean(segment ** 2)))
-  # Scale to 0-100 (typical audio RMS is 0.0 to ~0.4)
-  energy = float(np.interp(rms, [0.0, 0.4], [0.0, 100.0]))
-  return min(max(energy, 0.0), 100.0)
+  # seg @ seg: Quadratsumme per BLAS-dot, ohne temporaeres segment ** 2
+  rms = math.sqrt(float(segment @ segment) / n)
+  return float(_rms_to_energy(rms))
+
+
+def _section_sample_ranges(
+  n_samples: int, sr: int, starts: list[float], ends: list[float]
+) -> tuple[np.ndarray, np.ndarray]:
+  """
+  Convert section times to clamped [start, end) sample indices.
+
+  Same clamping as _compute_section_energy: every section covers at least one sample.
+  """
+  start_idx = (np.asarray(starts, dtype=np.float64) * sr).astype(np.int64)
+  end_idx = (np.asarray(ends, dtype=np.float64) * sr).astype(np.int64)
+  start_idx = np.clip(start_idx, 0, n_samples - 1)
+  end_idx = np.maximum(start_idx + 1, np.minimum(end_idx, n_samples))
+  return start_idx, end_idx
+
+
+def _compute_section_profiles(
+  y: np.ndarray, sr: int, boundaries: list[float], duration: float
+) -> tuple[list[float], list[str]]:
+  """
+  Compute average energy (0-100) and energy trend for all sections at once.
+
+  Squares the signal a single time and sums it between all section starts,
+  midpoints and ends with one np.add.reduceat pass, instead of slicing and
+  squaring y once per section for the energy and again for the trend. Only
+  the squared copy of y (in y's dtype) is allocated at full length.
+
+  Args:
+    y: Full audio signal
+    sr: Sample rate
+    boundaries: Section start times (sorted), last section ends at duration
+    duration: Track duration
+
+  Returns:
+    (energies, trends), same values as _compute_section_energy and
+    _compute_energy_trend per section
+  """
+  if len(y) == 0:
+    return [0.0] * len(boundaries), ["stable"] * len(boundaries)
+
+  ends = list(boundaries[1:]) + [duration]
+  start_idx, end_idx = _section_sample_ranges(len(y), sr, boundaries, ends)
+  length = end_idx - start_idx
+  mid_idx = start_idx + length // 2
+
+  # Quadratsummen zwischen allen Schnittpunkten (sortiert, eindeutig, < len(y)).
+  # reduceat summiert paarweise im dtype von y; dtype=float64 wuerde das ganze
+  # quadrierte Signal nach float64 casten, daher erst die Stueck-Summen wandeln.
+  cuts = np.unique(np.concatenate((start_idx, mid_idx, end_idx)))
+  cuts = cuts[cuts < len(y)]
+  piece_sums = np.add.reduceat(np.square(y), cuts).astype(np.float64)
+  # Kleine Prefix-Summe ueber die Stuecke (eine pro Schnittpunkt, nicht pro Sample)
+  prefix = np.concatenate(([0.0], np.cumsum(piece_sums)))
+  at_start = prefix[np.searchsorted(cuts, start_idx)]
+  at_mid = prefix[np.searchsorted(cuts, mid_idx)]
+  at_end = prefix[np.searchsorted(cuts, end_idx)]
+  # Prefix-Differenzen koennen durch Rundung minimal negativ werden
+  total = np.maximum(at_end - at_start, 0.0)
+  first = np.maximum(at_mid - at_start, 0.0)
+  second = np.maximum(at_end - at_mid, 0.0)
+
+  energies = _rms_to_energy(np.sqrt(total / length)).tolist()
+
+  # Trend: RMS der zweiten Haelfte relativ zur ersten (wie _compute_energy_trend)
+  first_rms = np.sqrt(first / np.maximum(mid_idx - start_idx, 1))
+  second_rms = np.sqrt(second / np.maximum(end_idx - mid_idx, 1))
+  with np.errstate(divide="ignore", invalid="ignore"):
+    ratio = second_rms / first_rms
+  silent_start = first_rms == 0
+  rising = np.where(silent_start, second_rms > 0, ratio > 1.3)
+  falling = ~silent_start & (ratio < 0.7)
+  too_short = length < sr  # Weniger als 1 Sekunde
+  trends = np.select(
+    [too_short, rising, falling], ["stable", "rising", "falling"], default="stable"
+  ).tolist()
+  return energies, trends
+
+
+# Lookup fuer _compute_energy_trend: Index = (ratio > 1.3) - (ratio < 0.7) + 1
+_TRENDS = ("falling", "stable", "rising")
 
 
 def _compute_energy_trend(y: np.ndarray, sr: int, start: float, end: float) -> str:
@@ -332,20 +553,18 @@ def _compute_energy_trend(y: np.ndarray, sr: int, start: float, end: float) -> s
   if len(segment) < sr:  # Less than 1 second
     return "stable"
 
-  # Split into first and second half
+  # Split into first and second half (seg @ seg: Quadratsumme ohne Temporaer-Array)
   mid = len(segment) // 2
-  first_half_rms = float(np.sqrt(np.mean(segment[:mid] ** 2)))
-  second_half_rms = float(np.sqrt(np.mean(segment[mid:] ** 2)))
-
-  if first_half_rms == 0:
-    return "rising" if second_half_rms > 0 else "stable"
+  first, second = segment[:mid], segment[mid:]
+  first_half_rms = math.sqrt(float(first @ first) / len(first))
+  second_half_rms = math.sqrt(float(second @ second) / len(second))
 
-  ratio = second_half_rms / first_half_rms
-  if ratio > 1.3:
-    return "rising"
-  elif ratio < 0.7:
-    return "falling"
-  return "stable"
+  # Stiller Anfang: jede Energie danach ist "rising", Stille bleibt "stable"
+  if first_half_rms > 0:
+    ratio = second_half_rms / first_half_rms
+  else:
+    ratio = math.inf if second_half_rms > 0 else 1.0
+  return _TRENDS[(ratio > 1.3) - (ratio < 0.7) + 1]
 
 
 def _label_sections(
@@ -424,28 +643,32 @@ def _label_sections(
           or energies[-2] < intro_relative_threshold):
         labels[-2] = "outro"
 
+  # Steps 3-5 as boolean masks over all sections. Only sections still
+  # labeled "main" are eligible; builds/breakdowns never create drops, so
+  # the neighbour checks only depend on the drop mask.
+  energy_arr = np.asarray(energies, dtype=np.float64)
+  rising = np.array([t == "rising" for t in trends], dtype=bool)
+  is_main = np.array([label == "main" for label in labels], dtype=bool)
+
   # Step 3: Label drops (high energy sections)
-  for i in range(n):
-    if labels[i] != "main":
-      continue
-    if energies[i] >= high_threshold:
-      labels[i] = "drop"
+  is_drop = is_main & (energy_arr >= high_threshold)
 
   # Step 4: Label builds (rising energy before a drop)
-  for i in range(n - 1):
-    if labels[i] != "main":
-      continue
-    if labels[i + 1] == "drop" and trends[i] == "rising":
-      labels[i] = "build"
+  next_is_drop = np.append(is_drop[1:], False)
+  is_build = is_main & ~is_drop & next_is_drop & rising
 
   # Step 5: Label breakdowns (low energy after a drop)
-  for i in range(1, n):
-    if labels[i] != "main":
-      continue
-    if labels[i - 1] == "drop" and energies[i] < avg_energy * ENERGY_BREAKDOWN_THRESHOLD:
-      labels[i] = "breakdown"
+  prev_is_drop = np.insert(is_drop[:-1], 0, False)
+  is_breakdown = (
+    is_main & ~is_drop & ~is_build & prev_is_drop
+    & (energy_arr < avg_energy * ENERGY_BREAKDOWN_THRESHOLD)
+  )
 
-  return labels
+  return np.select(
+    [is_drop, is_build, is_breakdown],
+    ["drop", "build", "breakdown"],
+    default=np.array(labels),
+  ).tolist()
 
 
 # === Main Analysis Function ===
@@ -476,12 +699,33 @@ def analyze_structure(
   if duration <= 0 or bpm <= 0:
     return TrackStructure()
 
+  # Einheitlich float32/C-contiguous (librosa.load liefert float32, andere
+  # Aufrufer evtl. float64); keine Kopie, wenn y schon passt
+  y = np.ascontiguousarray(y, dtype=np.float32)
+
   # Determine phrase unit based on genre
   phrase_unit = GENRE_PHRASE_UNITS.get(genre, 8)
 
-  seconds_per_beat = 60.0 / bpm
-  seconds_per_bar = seconds_per_beat * METER
-  total_bars = int(duration / seconds_per_bar)
+  grid = _BarGrid.from_bpm(bpm, duration)
+
+  # Flaches/stilles Audio: kein SSM noetig, ein einziger "main"-Abschnitt.
+  # Vorpruefung auf ~1 kHz heruntergetastet, Bestaetigung auf dem vollen
+  # Signal (sonst koennte ein Ton auf einem Vielfachen der Schrittweite
+  # faelschlich flach aussehen).
+  if (np.ptp(y[::max(1, sr // 1000)]) < FLAT_AUDIO_PTP
+      and np.ptp(y) < FLAT_AUDIO_PTP):
+    return TrackStructure(
+      sections=[TrackSection(
+        label="main",
+        start_time=0.0,
+        end_time=round(duration, 2),
+        start_bar=0,
+        end_bar=int(grid.time_to_bar(duration)),
+        avg_energy=round(_compute_section_energy(y, sr, 0.0, duration), 1),
+      )],
+      total_bars=grid.total_bars,
+      phrase_unit=phrase_unit,
+    )
 
   try:
     # Step 1: Compute novelty curve
@@ -490,59 +734,47 @@ def analyze_structure(
     # Step 2: Pick section boundaries
     boundaries = _pick_boundaries(
       novelty, times, duration,
-      min_distance_sec=max(MIN_SECTION_DURATION, seconds_per_bar * phrase_unit * 0.5),
+      min_distance_sec=max(MIN_SECTION_DURATION, grid.seconds_per_bar * phrase_unit * 0.5),
     )
 
     # Step 3: Quantize to bar grid
-    boundaries = _quantize_to_bars(boundaries, bpm, duration, phrase_unit)
+    boundaries = grid.quantize(boundaries)
 
     # Ensure we have at least intro + main + outro
     if len(boundaries) < 2:
       # Fallback: split into 3 equal-ish sections
-      third = duration / 3.0
-      boundaries = [0.0, third, 2.0 * third]
-      boundaries = _quantize_to_bars(boundaries, bpm, duration, phrase_unit)
+      boundaries = grid.quantize(np.arange(3) * (duration / 3.0))
 
   except Exception as e:
     logger.warning(f"Novelty-Analyse fehlgeschlagen: {e}")
     # Fallback: simple 3-section split
-    third = duration / 3.0
-    boundaries = [0.0, third, 2.0 * third]
-    boundaries = _quantize_to_bars(boundaries, bpm, duration, phrase_unit)
+    boundaries = grid.quantize(np.arange(3) * (duration / 3.0))
 
   # Step 4: Compute energy and trend for each section
   section_ends = boundaries[1:] + [duration]
-  energies = []
-  trends = []
-
-  for i, start in enumerate(boundaries):
-    end = section_ends[i]
-    energy = _compute_section_energy(y, sr, start, end)
-    trend = _compute_energy_trend(y, sr, start, end)
-    energies.append(energy)
-    trends.append(trend)
+  energies, trends = _compute_section_profiles(y, sr, boundaries, duration)
 
   # Step 5: Label sections
   labels = _label_sections(boundaries, duration, energies, trends)
 
   # Step 6: Build TrackSection objects
+  start_bars = grid.time_to_bar(boundaries).tolist()
+  end_bars = grid.time_to_bar(section_ends).tolist()
   sections = []
   for i, start in enumerate(boundaries):
     end = section_ends[i]
-    start_bar = int(round(start / seconds_per_bar))
-    end_bar = int(round(end / seconds_per_bar))
 
     sections.append(TrackSection(
       label=labels[i] if i < len(labels) else "main",
       start_time=round(start, 2),
       end_time=round(end, 2),
-      start_bar=start_bar,
-      end_bar=end_bar,
+      start_bar=start_bars[i],
+      end_bar=end_bars[i],
       avg_energy=round(energies[i], 1) if i < len(energies) else 50.0,
     ))
 
   return TrackStructure(
     sections=sections,
-    total_bars=total_bars,
+    total_bars=grid.total_bars,
     phrase_unit=phrase_unit,
   )
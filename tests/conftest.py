@@ -245,6 +245,17 @@ def bpm_tolerance_cases():
 
 # === pytest configuration ===
 
+def pytest_cmdline_main(config):
+  """HPG_FAST_TESTS=1: Cache-Plugin fuer schnelle TDD-Laeufe abschalten.
+
+  Entspricht -p no:cacheprovider, laesst CI (ohne Variable) aber --lf/--ff
+  nutzen. stepwise haengt vom Cache ab und wird mit abgeschaltet.
+  """
+  if os.environ.get("HPG_FAST_TESTS") == "1":
+    config.pluginmanager.set_blocked("cacheprovider")
+    config.pluginmanager.set_blocked("stepwise")
+
+
 def pytest_configure(config):
   """Add custom markers."""
   config.addinivalue_line(
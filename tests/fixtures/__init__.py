@@ -14,12 +14,19 @@ from .audio_generators import (
 )
 from .track_factories import (
     make_track,
+    make_shared_track,
     make_house_track,
     make_techno_track,
     make_dnb_track,
     make_minimal_track,
     make_dj_set,
 )
+from .rekordbox_stubs import (
+    FakeRbTrack,
+    FakePlaylist,
+    FakeRekordboxXml,
+    PersistingRekordboxXml,
+)
 from .camelot_test_data import (
     EXPECTED_CAMELOT_MAP,
     COMPATIBILITY_RULES,
@@ -41,11 +48,17 @@ __all__ = [
     'DEFAULT_SR',
     # Track factories
     'make_track',
+    'make_shared_track',
     'make_house_track',
     'make_techno_track',
     'make_dnb_track',
     'make_minimal_track',
     'make_dj_set',
+    # pyrekordbox stubs
+    'FakeRbTrack',
+    'FakePlaylist',
+    'FakeRekordboxXml',
+    'PersistingRekordboxXml',
     # Test data
     'EXPECTED_CAMELOT_MAP',
     'COMPATIBILITY_RULES',
@@ -0,0 +1,81 @@
+"""
+Stubs fuer pyrekordbox (RekordboxXml & Co.) ohne echte Abhaengigkeit.
+Werden per monkeypatch anstelle von pyrekordbox.rbxml.RekordboxXml eingesetzt.
+"""
+from collections import defaultdict
+from pathlib import Path
+
+
+class FakeRbTrack:
+  """Simuliert ein pyrekordbox Track-Objekt (nur Item-Zuweisung + get)."""
+
+  __slots__ = ("_attrs",)
+
+  def __init__(self):
+    self._attrs = {}
+
+  def __setitem__(self, key, value):
+    self._attrs[key] = value
+
+  def __getitem__(self, key):
+    return self._attrs[key]
+
+  def get(self, key, default=None):
+    return self._attrs.get(key, default)
+
+
+class FakePlaylist:
+  def __init__(self):
+    self.tracks = []
+
+  def add_track(self, tid):
+    self.tracks.append(tid)
+
+
+class FakeRekordboxXml:
+  """Minimal-Stub fuer RekordboxXml ohne pyrekordbox.
+
+  save() schreibt nur mit persist=True auf die Platte; sonst wird nur
+  saved_path gemerkt (reicht fuer alle Tests ohne Dateisystem-Assert).
+  """
+
+  _last = None  # Zuletzt erzeugte Instanz (export() erzeugt sie selbst)
+
+  def __init__(self, persist=False):
+    FakeRekordboxXml._last = self
+    self.persist = persist
+    self.tracks = []
+    self.playlists = defaultdict(FakePlaylist)
+    self.cues = []
+    self.cue_names = set()
+    self.saved_path = None
+
+  def add_track(self, uri):
+    t = FakeRbTrack()
+    t["Location"] = uri
+    self.tracks.append(t)
+    return t
+
+  def get_playlist(self, group, name):
+    return self.playlists[f"{group}/{name}"]
+
+  def add_cue(self, rb_track, name, time, type):
+    self.cues.append({"track": rb_track, "name": name, "time": time})
+    self.cue_names.add(name)
+
+  def save(self, path):
+    self.saved_path = path
+    if self.persist:
+      Path(path).write_bytes(b"<NML/>")
+
+  @classmethod
+  def last_instance(cls):
+    """Die Instanz, die der zuletzt ausgefuehrte export() benutzt hat."""
+    return FakeRekordboxXml._last
+
+
+class PersistingRekordboxXml(FakeRekordboxXml):
+  """FakeRekordboxXml, dessen save() wirklich eine Datei schreibt."""
+
+  def __init__(self):
+    super().__init__(persist=True)
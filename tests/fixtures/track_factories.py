@@ -2,6 +2,8 @@
 Track-Factory fuer schnelle Test-Erstellung.
 Erzeugt vorkonfigurierte Track-Objekte mit DJ-realistischen Werten.
 """
+import functools
+
 from hpg_core.models import Track, CAMELOT_MAP, key_to_camelot
 
 
@@ -35,6 +37,21 @@ def make_track(**overrides) -> Track:
   return Track(**defaults)
 
 
+@functools.lru_cache(maxsize=256)
+def _make_shared_track(items: tuple) -> Track:
+  return make_track(**dict(items))
+
+
+def make_shared_track(**overrides) -> Track:
+  """Wie make_track, aber pro Argument-Kombination gecacht.
+
+  Gleiche Argumente liefern DIESELBE Instanz — nur fuer Tests verwenden,
+  die den Track nicht veraendern (z.B. Exporter). Alle Werte muessen
+  hashbar sein.
+  """
+  return _make_shared_track(tuple(sorted(overrides.items())))
+
+
 def make_house_track(**overrides) -> Track:
   """House Track: 124-128 BPM, hohe Energie."""
   defaults = {
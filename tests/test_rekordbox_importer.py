@@ -5,11 +5,11 @@ Mockt REKORDBOX_AVAILABLE=True + Rekordbox6Database-Stub um Instanziierung zu
 ermoeglichen. Testet alle Pure-Python-Methoden ohne echtes pyrekordbox.
 
 HINWEIS: Rekordbox6Database existiert NICHT im Modul-Namespace wenn pyrekordbox
-nicht installiert ist → create=True bei allen Patches erforderlich.
+nicht installiert ist → setattr(..., raising=False) bei allen Stubs erforderlich.
 """
+import copy
 import os
 import pytest
-from unittest.mock import patch
 import hpg_core.rekordbox_importer as rb_module
 from hpg_core.rekordbox_importer import (
   RekordboxImporter,
@@ -70,6 +70,28 @@ class FakeContent:
     self.ColorName = color_name
     self.Cues = cues or []
 
+  def clone(self, **overrides):
+    """Kopie mit ueberschriebenen Attributen (Rekordbox-Namen, z.B. FileNameL).
+
+    Cues wird mitkopiert, damit Klone sich die Liste nicht teilen.
+    """
+    content = copy.copy(self)
+    content.Cues = list(self.Cues)
+    for name, value in overrides.items():
+      setattr(content, name, value)
+    return content
+
+
+_DEFAULT_CONTENT = FakeContent()
+
+
+def make_contents(n, **overrides):
+  """n Kopien von _DEFAULT_CONTENT mit eindeutigen Dateinamen t0.mp3 ... t{n-1}.mp3."""
+  return [
+    _DEFAULT_CONTENT.clone(FileNameL=f"t{i}.mp3", FileNameS=f"t{i}.mp3", **overrides)
+    for i in range(n)
+  ]
+
 
 class FakeDatabase:
   """Minimal-Stub fuer Rekordbox6Database ohne pyrekordbox."""
@@ -81,18 +103,23 @@ class FakeDatabase:
     return self._contents
 
 
+# Lookup-Tests brauchen nur Pfad-Strings: get_track_data() ist ein reiner
+# Cache-Lookup und greift nie aufs Dateisystem zu → kein tmp_path noetig
+FAKE_FOLDER = os.path.join(os.sep, "fake", "music")
+
+
 # ─── Hilfsfunktionen ──────────────────────────────────────────────────────────
 
 def make_importer(db=None):
   """Erstellt RekordboxImporter mit REKORDBOX_AVAILABLE=True und FakeDatabase."""
   _db = db if db is not None else FakeDatabase()
-  with patch("hpg_core.rekordbox_importer.REKORDBOX_AVAILABLE", True):
-    with patch(
-      "hpg_core.rekordbox_importer.Rekordbox6Database",
-      lambda: _db,
-      create=True,  # PFLICHT: Rekordbox6Database existiert nicht ohne pyrekordbox
-    ):
-      return RekordboxImporter()
+  # MonkeyPatch.context() statt patch(): funktioniert auch in class/module-
+  # scoped Fixtures und braucht nur einen Attribut-Write pro Stub
+  with pytest.MonkeyPatch.context() as mp:
+    mp.setattr(rb_module, "REKORDBOX_AVAILABLE", True)
+    # PFLICHT raising=False: Rekordbox6Database existiert nicht ohne pyrekordbox
+    mp.setattr(rb_module, "Rekordbox6Database", lambda: _db, raising=False)
+    return RekordboxImporter()
 
 
 def make_importer_with_track(
@@ -109,35 +136,49 @@ def make_importer_with_track(
   return make_importer(db=FakeDatabase([content]))
 
 
+# ─── Fixtures ─────────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def rekordbox_unavailable(monkeypatch):
+  """Setzt REKORDBOX_AVAILABLE=False (monkeypatch stellt nach dem Test zurueck)."""
+  monkeypatch.setattr(rb_module, "REKORDBOX_AVAILABLE", False)
+
+
+@pytest.fixture
+def unavailable_importer(rekordbox_unavailable):
+  """RekordboxImporter ohne pyrekordbox (db=None, leerer Cache)."""
+  return RekordboxImporter()
+
+
+@pytest.fixture(scope="module")
+def default_importer():
+  """Importer mit genau einem Default-FakeContent — nur lesend verwenden."""
+  return make_importer(db=FakeDatabase([FakeContent()]))
+
+
 # ─── Tests: Initialisierung ───────────────────────────────────────────────────
 
 class TestRekordboxImporterInit:
   """Initialisierung und Fehlerbehandlung."""
 
-  def test_init_ohne_pyrekordbox_db_ist_none(self):
-    with patch("hpg_core.rekordbox_importer.REKORDBOX_AVAILABLE", False):
-      imp = RekordboxImporter()
-    assert imp.db is None
+  def test_init_ohne_pyrekordbox_db_ist_none(self, unavailable_importer):
+    assert unavailable_importer.db is None
 
-  def test_init_ohne_pyrekordbox_cache_leer(self):
-    with patch("hpg_core.rekordbox_importer.REKORDBOX_AVAILABLE", False):
-      imp = RekordboxImporter()
-    assert len(imp.track_cache) == 0
+  def test_init_ohne_pyrekordbox_cache_leer(self, unavailable_importer):
+    assert len(unavailable_importer.track_cache) == 0
 
-  def test_init_mit_db_laedt_tracks(self):
-    content = FakeContent(folder_path="C:\\Music", filename="track.mp3", bpm=12800)
-    imp = make_importer(db=FakeDatabase([content]))
-    assert len(imp.track_cache) == 1
+  def test_init_mit_db_laedt_tracks(self, default_importer):
+    assert len(default_importer.track_cache) == 1
 
-  def test_init_db_fehler_wird_abgefangen(self):
+  def test_init_db_fehler_wird_abgefangen(self, monkeypatch):
     """Wenn Rekordbox6Database() eine Exception wirft, bleibt db=None."""
-    with patch("hpg_core.rekordbox_importer.REKORDBOX_AVAILABLE", True):
-      with patch(
-        "hpg_core.rekordbox_importer.Rekordbox6Database",
-        side_effect=RuntimeError("DB nicht gefunden"),
-        create=True,
-      ):
-        imp = RekordboxImporter()
+
+    def broken_db():
+      raise RuntimeError("DB nicht gefunden")
+
+    monkeypatch.setattr(rb_module, "REKORDBOX_AVAILABLE", True)
+    monkeypatch.setattr(rb_module, "Rekordbox6Database", broken_db, raising=False)
+    imp = RekordboxImporter()
     assert imp.db is None
     assert len(imp.track_cache) == 0
 
@@ -147,10 +188,8 @@ class TestRekordboxImporterInit:
 class TestIsAvailable:
   """is_available() Logik."""
 
-  def test_false_wenn_db_none(self):
-    with patch("hpg_core.rekordbox_importer.REKORDBOX_AVAILABLE", False):
-      imp = RekordboxImporter()
-    assert imp.is_available() is False
+  def test_false_wenn_db_none(self, unavailable_importer):
+    assert unavailable_importer.is_available() is False
 
   def test_false_wenn_cache_leer(self):
     # DB vorhanden aber kein Track
@@ -158,10 +197,8 @@ class TestIsAvailable:
     # db ist gesetzt aber cache ist leer
     assert imp.is_available() is False
 
-  def test_true_mit_tracks(self):
-    content = FakeContent()
-    imp = make_importer(db=FakeDatabase([content]))
-    assert imp.is_available() is True
+  def test_true_mit_tracks(self, default_importer):
+    assert default_importer.is_available() is True
 
 
 # ─── Tests: _safe_bpm ─────────────────────────────────────────────────────────
@@ -196,47 +233,30 @@ class TestSafeBpm:
 class TestConvertKeyToCamelot:
   """_convert_key_to_camelot() Konvertierungslogik."""
 
-  def test_camelot_code_wird_direkt_zurueckgegeben(self):
-    imp = make_importer()
-    assert imp._convert_key_to_camelot("8A") == "8A"
-
-  def test_alle_camelot_codes_passthrough(self):
-    imp = make_importer()
-    for num in range(1, 13):
-      assert imp._convert_key_to_camelot(f"{num}A") == f"{num}A"
-      assert imp._convert_key_to_camelot(f"{num}B") == f"{num}B"
-
-  def test_am_ergibt_8a(self):
-    imp = make_importer()
-    assert imp._convert_key_to_camelot("Am") == "8A"
-
-  def test_c_dur_ergibt_8b(self):
-    imp = make_importer()
-    assert imp._convert_key_to_camelot("C") == "8B"
-
-  def test_flat_minor_dbm_ergibt_12a(self):
-    """Db → C# → CAMELOT_MAP[("C#","Minor")] = "12A"."""
-    imp = make_importer()
-    assert imp._convert_key_to_camelot("Dbm") == "12A"
-
-  def test_flat_major_bb_ergibt_6b(self):
-    """Bb → A# → CAMELOT_MAP[("A#","Major")] = "6B"."""
-    imp = make_importer()
-    assert imp._convert_key_to_camelot("Bb") == "6B"
-
-  def test_unbekannte_notation_ergibt_none(self):
-    imp = make_importer()
-    assert imp._convert_key_to_camelot("Unknown") is None
-    assert imp._convert_key_to_camelot("XY") is None
-
-  def test_whitespace_wird_normiert(self):
-    imp = make_importer()
-    assert imp._convert_key_to_camelot("  8A  ") == "8A"
-
-  def test_eb_minor_ergibt_2a(self):
-    """Eb → D# → CAMELOT_MAP[("D#","Minor")] = "2A"."""
-    imp = make_importer()
-    assert imp._convert_key_to_camelot("Ebm") == "2A"
+  @pytest.fixture(scope="class")
+  def importer(self):
+    """Ein Importer fuer alle Konvertierungs-Tests (reine Funktion, kein State)."""
+    return make_importer()
+
+  @pytest.mark.parametrize("key,expected", [
+    ("8A", "8A"),         # Camelot-Code wird direkt zurueckgegeben
+    ("Am", "8A"),
+    ("C", "8B"),
+    ("Dbm", "12A"),       # Db → C# → CAMELOT_MAP[("C#","Minor")]
+    ("Bb", "6B"),         # Bb → A# → CAMELOT_MAP[("A#","Major")]
+    ("Unknown", None),
+    ("XY", None),
+    ("  8A  ", "8A"),     # Whitespace wird normiert
+    ("Ebm", "2A"),        # Eb → D# → CAMELOT_MAP[("D#","Minor")]
+  ])
+  def test_convert(self, importer, key, expected):
+    assert importer._convert_key_to_camelot(key) == expected
+
+  @pytest.mark.parametrize("letter", ["A", "B"])
+  @pytest.mark.parametrize("num", range(1, 13))
+  def test_alle_camelot_codes_passthrough(self, importer, num, letter):
+    code = f"{num}{letter}"
+    assert importer._convert_key_to_camelot(code) == code
 
 
 # ─── Tests: _extract_cue_points ───────────────────────────────────────────────
@@ -294,17 +314,34 @@ class TestExtractCuePoints:
 class TestBuildTrackCache:
   """_build_track_cache() Cache-Aufbau."""
 
-  def test_cache_wird_aufgebaut(self):
-    content = FakeContent(folder_path="C:\\Music", filename="track.mp3")
-    imp = make_importer(db=FakeDatabase([content]))
-    assert len(imp.track_cache) == 1
+  @pytest.fixture(scope="class", params=[
+    ({"bpm": 13600}, {"bpm": pytest.approx(136.0)}),
+    ({"key_name": "Am"}, {"camelot_code": "8A"}),
+    ({"key_name": "8A"}, {"camelot_code": "8A"}),
+    (
+      {
+        "title": "Night Drive",
+        "artist_name": "Djane Cosmic",
+        "genre_name": "Techno",
+      },
+      {"title": "Night Drive", "artist": "Djane Cosmic", "genre": "Techno"},
+    ),
+  ], ids=["bpm", "key_konvertiert", "camelot_unveraendert", "metadata"])
+  def loaded_track(self, request):
+    """Baut den Cache einmal pro Content-Konfiguration: (track_data, checks)."""
+    overrides, checks = request.param
+    imp = make_importer(db=FakeDatabase([FakeContent(**overrides)]))
+    return next(iter(imp.track_cache.values())), checks
+
+  def test_cache_wird_aufgebaut(self, default_importer):
+    assert len(default_importer.track_cache) == 1
 
   def test_pfad_wird_normalisiert(self):
     """Cache-Key muss normalisiert (lowercase, backslash) sein."""
     content = FakeContent(folder_path="C:\\MUSIC", filename="TRACK.MP3")
     imp = make_importer(db=FakeDatabase([content]))
     # Key muss lowercase sein
-    key = list(imp.track_cache.keys())[0]
+    key = next(iter(imp.track_cache))
     assert key == key.lower()
 
   def test_track_ohne_dateiname_wird_ignoriert(self):
@@ -319,44 +356,17 @@ class TestBuildTrackCache:
     imp = make_importer(db=FakeDatabase([NoNameContent()]))
     assert len(imp.track_cache) == 0
 
-  def test_bpm_wird_korrekt_geladen(self):
-    """BPM 13600 → 136.0 BPM."""
-    content = FakeContent(bpm=13600)
-    imp = make_importer(db=FakeDatabase([content]))
-    data = list(imp.track_cache.values())[0]
-    assert data.bpm == pytest.approx(136.0)
-
-  def test_key_camelot_wird_konvertiert(self):
-    """KeyName 'Am' wird zu Camelot '8A' konvertiert."""
-    content = FakeContent(key_name="Am")
-    imp = make_importer(db=FakeDatabase([content]))
-    data = list(imp.track_cache.values())[0]
-    assert data.camelot_code == "8A"
-
-  def test_camelot_key_bleibt_unveraendert(self):
-    """KeyName '8A' (bereits Camelot) bleibt '8A'."""
-    content = FakeContent(key_name="8A")
-    imp = make_importer(db=FakeDatabase([content]))
-    data = list(imp.track_cache.values())[0]
-    assert data.camelot_code == "8A"
-
-  def test_metadata_werden_geladen(self):
-    content = FakeContent(
-      title="Night Drive",
-      artist_name="Djane Cosmic",
-      genre_name="Techno",
-    )
-    imp = make_importer(db=FakeDatabase([content]))
-    data = list(imp.track_cache.values())[0]
-    assert data.title == "Night Drive"
-    assert data.artist == "Djane Cosmic"
-    assert data.genre == "Techno"
+  def test_felder_werden_geladen(self, loaded_track):
+    """BPM 13600 → 136.0, KeyName 'Am' → '8A', '8A' bleibt, Metadaten 1:1."""
+    data, checks = loaded_track
+    for attr, expected in checks.items():
+      assert getattr(data, attr) == expected, attr
 
   def test_cues_werden_geladen(self):
     cue = FakeCue(in_msec=30000, comment="Drop")
     content = FakeContent(cues=[cue])
     imp = make_importer(db=FakeDatabase([content]))
-    data = list(imp.track_cache.values())[0]
+    data = next(iter(imp.track_cache.values()))
     assert data.cue_points is not None
     assert len(data.cue_points) == 1
 
@@ -366,40 +376,38 @@ class TestBuildTrackCache:
 class TestGetTrackData:
   """get_track_data() Lookup-Logik."""
 
-  def test_exact_path_match(self, tmp_path):
-    folder = str(tmp_path)
+  def test_exact_path_match(self):
+    folder = FAKE_FOLDER
     filename = "track.mp3"
     imp = make_importer_with_track(folder, filename, bpm=12800)
     data = imp.get_track_data(os.path.join(folder, filename))
     assert data is not None
     assert data.bpm == pytest.approx(128.0)
 
-  def test_filename_fallback(self, tmp_path):
+  def test_filename_fallback(self):
     """Track in anderem Ordner, gleiches Filename → Fallback findet ihn."""
-    original_folder = str(tmp_path / "original")
+    original_folder = os.path.join(FAKE_FOLDER, "original")
     filename = "track.mp3"
     imp = make_importer_with_track(original_folder, filename, bpm=14000)
     # Suche mit anderem Pfad, gleichem Dateinamen
-    other_path = os.path.join(str(tmp_path / "moved"), filename)
+    other_path = os.path.join(FAKE_FOLDER, "moved", filename)
     data = imp.get_track_data(other_path)
     assert data is not None
     assert data.bpm == pytest.approx(140.0)
 
-  def test_nicht_gefunden_ergibt_none(self, tmp_path):
-    content = FakeContent(folder_path=str(tmp_path), filename="track.mp3")
+  def test_nicht_gefunden_ergibt_none(self):
+    content = FakeContent(folder_path=FAKE_FOLDER, filename="track.mp3")
     imp = make_importer(db=FakeDatabase([content]))
-    result = imp.get_track_data(str(tmp_path / "does_not_exist.mp3"))
+    result = imp.get_track_data(os.path.join(FAKE_FOLDER, "does_not_exist.mp3"))
     assert result is None
 
-  def test_unavailable_ergibt_none(self):
-    with patch("hpg_core.rekordbox_importer.REKORDBOX_AVAILABLE", False):
-      imp = RekordboxImporter()
-    result = imp.get_track_data("C:\\Music\\track.mp3")
+  def test_unavailable_ergibt_none(self, unavailable_importer):
+    result = unavailable_importer.get_track_data("C:\\Music\\track.mp3")
     assert result is None
 
-  def test_pfad_case_insensitiv(self, tmp_path):
+  def test_pfad_case_insensitiv(self):
     """Windows-Pfade sind case-insensitiv — Grossbuchstaben matchen."""
-    folder = str(tmp_path)
+    folder = FAKE_FOLDER
     filename = "Track.MP3"
     imp = make_importer_with_track(folder, filename)
     # Lookup mit lowercase
@@ -414,53 +422,41 @@ class TestGetTrackData:
 class TestStatisticsUndHelpers:
   """get_statistics(), get_available_count(), has_track()."""
 
-  def test_get_statistics_unavailable(self):
-    with patch("hpg_core.rekordbox_importer.REKORDBOX_AVAILABLE", False):
-      imp = RekordboxImporter()
-    stats = imp.get_statistics()
+  def test_get_statistics_unavailable(self, unavailable_importer):
+    stats = unavailable_importer.get_statistics()
     assert stats["available"] is False
     assert stats["total_tracks"] == 0
 
-  def test_get_statistics_mit_tracks(self):
-    content = FakeContent(bpm=12800, key_name="8A")
-    imp = make_importer(db=FakeDatabase([content]))
-    stats = imp.get_statistics()
+  def test_get_statistics_mit_tracks(self, default_importer):
+    stats = default_importer.get_statistics()
     assert stats["available"] is True
     assert stats["total_tracks"] == 1
     assert stats["tracks_with_bpm"] == 1
     assert stats["tracks_with_key"] == 1
 
   def test_get_statistics_average_bpm(self):
-    contents = [
-      FakeContent(folder_path="C:\\Music", filename="a.mp3", bpm=12800),
-      FakeContent(folder_path="C:\\Music", filename="b.mp3", bpm=14000),
-    ]
+    contents = make_contents(2)
+    contents[1].BPM = 14000
     imp = make_importer(db=FakeDatabase(contents))
     stats = imp.get_statistics()
     assert stats["average_bpm"] == pytest.approx(134.0)
 
   def test_get_available_count(self):
-    contents = [
-      FakeContent(folder_path="C:\\Music", filename=f"t{i}.mp3")
-      for i in range(4)
-    ]
-    imp = make_importer(db=FakeDatabase(contents))
+    imp = make_importer(db=FakeDatabase(make_contents(4)))
     assert imp.get_available_count() == 4
 
-  def test_get_available_count_ohne_db(self):
-    with patch("hpg_core.rekordbox_importer.REKORDBOX_AVAILABLE", False):
-      imp = RekordboxImporter()
-    assert imp.get_available_count() == 0
+  def test_get_available_count_ohne_db(self, unavailable_importer):
+    assert unavailable_importer.get_available_count() == 0
 
-  def test_has_track_true(self, tmp_path):
-    folder = str(tmp_path)
+  def test_has_track_true(self):
+    folder = FAKE_FOLDER
     filename = "track.mp3"
     imp = make_importer_with_track(folder, filename)
     assert imp.has_track(os.path.join(folder, filename)) is True
 
-  def test_has_track_false(self, tmp_path):
+  def test_has_track_false(self):
     imp = make_importer(db=FakeDatabase([]))
-    assert imp.has_track(str(tmp_path / "missing.mp3")) is False
+    assert imp.has_track(os.path.join(FAKE_FOLDER, "missing.mp3")) is False
 
 
 # ─── Tests: RekordboxTrackData Dataclass ─────────────────────────────────────
@@ -488,21 +484,16 @@ class TestRekordboxTrackData:
 class TestSingleton:
   """get_rekordbox_importer() Singleton-Logik."""
 
-  def test_gibt_instanz_zurueck(self):
-    rb_module._rekordbox_importer = None  # Reset
-    try:
-      with patch("hpg_core.rekordbox_importer.REKORDBOX_AVAILABLE", False):
-        imp = get_rekordbox_importer()
-      assert isinstance(imp, RekordboxImporter)
-    finally:
-      rb_module._rekordbox_importer = None  # Cleanup
-
-  def test_singleton_wird_wiederverwendet(self):
-    rb_module._rekordbox_importer = None  # Reset
-    try:
-      with patch("hpg_core.rekordbox_importer.REKORDBOX_AVAILABLE", False):
-        i1 = get_rekordbox_importer()
-        i2 = get_rekordbox_importer()
-      assert i1 is i2
-    finally:
-      rb_module._rekordbox_importer = None  # Cleanup
+  @pytest.fixture(autouse=True)
+  def reset_singleton(self, monkeypatch):
+    """Singleton zuruecksetzen; monkeypatch stellt den alten Wert wieder her."""
+    monkeypatch.setattr(rb_module, "_rekordbox_importer", None)
+
+  def test_gibt_instanz_zurueck(self, rekordbox_unavailable):
+    imp = get_rekordbox_importer()
+    assert isinstance(imp, RekordboxImporter)
+
+  def test_singleton_wird_wiederverwendet(self, rekordbox_unavailable):
+    i1 = get_rekordbox_importer()
+    i2 = get_rekordbox_importer()
+    assert i1 is i2
@@ -5,80 +5,85 @@ Mockt PYREKORDBOX_AVAILABLE=True + RekordboxXml-Stub um Instanziierung zu
 ermoeglichen. Testet alle Pure-Python-Methoden ohne echtes pyrekordbox.
 
 HINWEIS: RekordboxXml existiert NICHT im Modul-Namespace wenn pyrekordbox
-nicht installiert ist → create=True bei allen Patches erforderlich.
+nicht installiert ist → raising=False bei allen Patches erforderlich.
 """
 import os
 import pytest
-from unittest.mock import patch
+from hpg_core.exporters import rekordbox_xml_exporter as _rbx_mod
 from hpg_core.exporters.rekordbox_xml_exporter import RekordboxXMLExporter
-from tests.fixtures.track_factories import make_track
+from tests.fixtures.rekordbox_stubs import (
+  FakeRekordboxXml,
+  PersistingRekordboxXml,
+)
+from tests.fixtures.track_factories import make_shared_track
 
 
-# ─── Fake-Klassen (Stubs fuer pyrekordbox) ────────────────────────────────────
+# Alle 24 Camelot-Codes (1A, 1B, ... 12A, 12B) fuer parametrisierte Tests
+ALL_CAMELOT_CODES = [f"{num}{letter}" for num in range(1, 13) for letter in "AB"]
+MINOR_CODES = [code for code in ALL_CAMELOT_CODES if code.endswith("A")]
+MAJOR_CODES = [code for code in ALL_CAMELOT_CODES if code.endswith("B")]
 
-class FakeRbTrack(dict):
-  """Simuliert ein pyrekordbox Track-Objekt (dict-like)."""
-  pass
+# BPM → erwarteter AverageBpm-String (vorformatiert, kein Format-Parsing im Test)
+BPM_FORMAT_CASES = [
+  (128.0, "128.00"),
+  (133.5, "133.50"),
+  (174.333, "174.33"),
+  (90, "90.00"),
+]
 
 
-class FakePlaylist:
-  def __init__(self):
-    self.tracks = []
+# ─── Test-spezifische Fakes ───────────────────────────────────────────────────
 
-  def add_track(self, tid):
-    self.tracks.append(tid)
+class BrokenCueRekordboxXml(PersistingRekordboxXml):
+  """Fake, dessen add_cue() immer fehlschlaegt (Export muss trotzdem klappen)."""
 
+  def add_cue(self, *args, **kwargs):
+    raise RuntimeError("Cue error")
 
-class FakeRekordboxXml:
-  """Minimal-Stub fuer RekordboxXml ohne pyrekordbox."""
 
-  def __init__(self):
-    self.tracks = []
-    self.playlists = {}
-    self.cues = []
-    self.saved_path = None
+# ─── Hilfsfunktionen ──────────────────────────────────────────────────────────
 
-  def add_track(self, uri):
-    t = FakeRbTrack()
-    t["Location"] = uri
-    self.tracks.append(t)
-    return t
+@pytest.fixture
+def patched_rekordbox(request, monkeypatch):
+  """Aktiviert PYREKORDBOX_AVAILABLE und ersetzt RekordboxXml durch eine Fake-Klasse.
 
-  def get_playlist(self, group, name):
-    key = f"{group}/{name}"
-    if key not in self.playlists:
-      self.playlists[key] = FakePlaylist()
-    return self.playlists[key]
+  Standard ist FakeRekordboxXml; andere Fakes per indirect-Parametrisierung:
+  @pytest.mark.parametrize("patched_rekordbox", [BrokenCueRekordboxXml], indirect=True)
 
-  def add_cue(self, rb_track, name, time, type):
-    self.cues.append({"track": rb_track, "name": name, "time": time})
+  Gibt die Fake-Klasse zurueck; nach export() liefert last_instance() die
+  verwendete Instanz.
+  """
+  fake_xml_cls = getattr(request, "param", FakeRekordboxXml)
+  monkeypatch.setattr(FakeRekordboxXml, "_last", None)
+  monkeypatch.setattr(_rbx_mod, "PYREKORDBOX_AVAILABLE", True)
+  # PFLICHT raising=False: RekordboxXml existiert nicht ohne pyrekordbox
+  monkeypatch.setattr(_rbx_mod, "RekordboxXml", fake_xml_cls, raising=False)
+  return fake_xml_cls
 
-  def save(self, path):
-    self.saved_path = path
-    with open(path, "w") as f:
-      f.write("<NML/>")
 
+@pytest.fixture(scope="session")
+def mkout(tmp_path_factory):
+  """mkout(name) → Pfad-String in einem gemeinsamen Export-Verzeichnis.
 
-# ─── Hilfsfunktionen ──────────────────────────────────────────────────────────
+  Dateinamen pro Test eindeutig halten.
+  """
+  out_dir = str(tmp_path_factory.mktemp("rbx"))
+  return lambda name: os.path.join(out_dir, name)
 
-def make_exporter():
-  """Erstellt RekordboxXMLExporter mit PYREKORDBOX_AVAILABLE=True."""
-  with patch("hpg_core.exporters.rekordbox_xml_exporter.PYREKORDBOX_AVAILABLE", True):
-    return RekordboxXMLExporter()
 
+@pytest.fixture(scope="module")
+def exporter():
+  """Ein Exporter fuer alle Tests, die nur reine Methoden aufrufen."""
+  # monkeypatch ist function-scoped → MonkeyPatch.context() fuer module-Scope
+  with pytest.MonkeyPatch.context() as mp:
+    mp.setattr(_rbx_mod, "PYREKORDBOX_AVAILABLE", True)
+    yield RekordboxXMLExporter()
 
-def make_export(playlist, out_path, fake_xml=None):
-  """Fuehrt export() mit FakeRekordboxXml durch."""
-  _xml = fake_xml or FakeRekordboxXml()
-  with patch("hpg_core.exporters.rekordbox_xml_exporter.PYREKORDBOX_AVAILABLE", True):
-    with patch(
-      "hpg_core.exporters.rekordbox_xml_exporter.RekordboxXml",
-      lambda: _xml,
-      create=True,
-    ):
-      exporter = RekordboxXMLExporter()
-      exporter.export(playlist, out_path)
-  return _xml
+
+@pytest.fixture(scope="module")
+def convert(exporter):
+  """Gebundene Methode _convert_camelot_to_rekordbox_key (einmal aufgeloest)."""
+  return exporter._convert_camelot_to_rekordbox_key
 
 
 # ─── Tests: Initialisierung ───────────────────────────────────────────────────
@@ -86,13 +91,14 @@ def make_export(playlist, out_path, fake_xml=None):
 class TestRekordboxXMLExporterInit:
   """Initialisierung und Import-Fehler."""
 
-  def test_init_ohne_pyrekordbox_raises_importerror(self):
-    with patch("hpg_core.exporters.rekordbox_xml_exporter.PYREKORDBOX_AVAILABLE", False):
-      with pytest.raises(ImportError, match="pyrekordbox"):
-        RekordboxXMLExporter()
+  def test_init_ohne_pyrekordbox_raises_importerror(self, monkeypatch):
+    monkeypatch.setattr(_rbx_mod, "PYREKORDBOX_AVAILABLE", False)
+    with pytest.raises(ImportError, match="pyrekordbox"):
+      RekordboxXMLExporter()
 
-  def test_init_mit_pyrekordbox_kein_fehler(self):
-    exporter = make_exporter()
+  def test_init_mit_pyrekordbox_kein_fehler(self, monkeypatch):
+    monkeypatch.setattr(_rbx_mod, "PYREKORDBOX_AVAILABLE", True)
+    exporter = RekordboxXMLExporter()
     assert isinstance(exporter, RekordboxXMLExporter)
 
 
@@ -101,24 +107,20 @@ class TestRekordboxXMLExporterInit:
 class TestRekordboxURIConvertierung:
   """_convert_to_rekordbox_uri Tests."""
 
-  def test_windows_pfad_zu_uri(self):
-    exporter = make_exporter()
+  def test_windows_pfad_zu_uri(self, exporter):
     uri = exporter._convert_to_rekordbox_uri("C:\\Music\\track.mp3")
     assert uri.startswith("file://localhost")
 
-  def test_uri_enthaelt_dateiname(self):
-    exporter = make_exporter()
+  def test_uri_enthaelt_dateiname(self, exporter):
     uri = exporter._convert_to_rekordbox_uri("C:\\Music\\Sets\\deep_set.wav")
     assert "deep_set.wav" in uri
 
-  def test_forward_slashes_in_uri(self):
-    exporter = make_exporter()
+  def test_forward_slashes_in_uri(self, exporter):
     uri = exporter._convert_to_rekordbox_uri("C:\\A\\B\\C\\track.wav")
     assert "/" in uri
     assert "\\" not in uri
 
-  def test_uri_format_korrekt(self):
-    exporter = make_exporter()
+  def test_uri_format_korrekt(self, exporter):
     uri = exporter._convert_to_rekordbox_uri("C:\\Music\\track.mp3")
     # Format: file://localhost/C:/Music/track.mp3
     assert "file://" in uri
@@ -130,50 +132,40 @@ class TestRekordboxURIConvertierung:
 class TestCamelotKeyKonvertierung:
   """_convert_camelot_to_rekordbox_key Tests."""
 
-  def test_8a_ergibt_am(self):
-    exporter = make_exporter()
-    assert exporter._convert_camelot_to_rekordbox_key("8A") == "Am"
+  def test_8a_ergibt_am(self, convert):
+    assert convert("8A") == "Am"
 
-  def test_8b_ergibt_c(self):
-    exporter = make_exporter()
-    assert exporter._convert_camelot_to_rekordbox_key("8B") == "C"
+  def test_8b_ergibt_c(self, convert):
+    assert convert("8B") == "C"
 
-  def test_lowercase_wird_normalisiert(self):
-    exporter = make_exporter()
-    assert exporter._convert_camelot_to_rekordbox_key("8a") == "Am"
-    assert exporter._convert_camelot_to_rekordbox_key("8b") == "C"
+  def test_lowercase_wird_normalisiert(self, convert):
+    assert convert("8a") == "Am"
+    assert convert("8b") == "C"
 
-  def test_whitespace_wird_ignoriert(self):
-    exporter = make_exporter()
-    assert exporter._convert_camelot_to_rekordbox_key("  8A  ") == "Am"
+  def test_whitespace_wird_ignoriert(self, convert):
+    assert convert("  8A  ") == "Am"
 
-  def test_unbekannter_code_ergibt_none(self):
-    exporter = make_exporter()
-    assert exporter._convert_camelot_to_rekordbox_key("13A") is None
-    assert exporter._convert_camelot_to_rekordbox_key("XY") is None
+  def test_unbekannter_code_ergibt_none(self, convert):
+    assert convert("13A") is None
+    assert convert("XY") is None
 
-  def test_leerer_string_ergibt_none(self):
-    exporter = make_exporter()
-    assert exporter._convert_camelot_to_rekordbox_key("") is None
-    assert exporter._convert_camelot_to_rekordbox_key(None) is None
+  def test_leerer_string_ergibt_none(self, convert):
+    assert convert("") is None
+    assert convert(None) is None
 
-  def test_alle_24_codes_gemappt(self):
-    exporter = make_exporter()
-    for num in range(1, 13):
-      assert exporter._convert_camelot_to_rekordbox_key(f"{num}A") is not None
-      assert exporter._convert_camelot_to_rekordbox_key(f"{num}B") is not None
+  @pytest.mark.parametrize("code", ALL_CAMELOT_CODES)
+  def test_alle_24_codes_gemappt(self, convert, code):
+    assert convert(code) is not None
 
-  def test_minor_keys_enden_auf_m(self):
-    exporter = make_exporter()
-    for num in range(1, 13):
-      key = exporter._convert_camelot_to_rekordbox_key(f"{num}A")
-      assert key.endswith("m"), f"{num}A sollte auf 'm' enden, got '{key}'"
+  @pytest.mark.parametrize("code", MINOR_CODES)
+  def test_minor_key_endet_auf_m(self, convert, code):
+    key = convert(code)
+    assert key.endswith("m"), f"{code} sollte auf 'm' enden, got '{key}'"
 
-  def test_major_keys_enden_nicht_auf_m(self):
-    exporter = make_exporter()
-    for num in range(1, 13):
-      key = exporter._convert_camelot_to_rekordbox_key(f"{num}B")
-      assert not key.endswith("m"), f"{num}B sollte nicht auf 'm' enden, got '{key}'"
+  @pytest.mark.parametrize("code", MAJOR_CODES)
+  def test_major_key_endet_nicht_auf_m(self, convert, code):
+    key = convert(code)
+    assert not key.endswith("m"), f"{code} sollte nicht auf 'm' enden, got '{key}'"
 
 
 # ─── Tests: Format Info ───────────────────────────────────────────────────────
@@ -181,8 +173,7 @@ class TestCamelotKeyKonvertierung:
 class TestRekordboxFormatInfo:
   """get_format_info Vollstaendigkeit."""
 
-  def test_format_info_vollstaendig(self):
-    exporter = make_exporter()
+  def test_format_info_vollstaendig(self, exporter):
     info = exporter.get_format_info()
     assert info["format"] == "Rekordbox XML"
     assert info["extension"] == ".xml"
@@ -190,14 +181,12 @@ class TestRekordboxFormatInfo:
     assert "features" in info
     assert "metadata_mapping" in info
 
-  def test_metadata_mapping_hat_bpm_und_key(self):
-    exporter = make_exporter()
+  def test_metadata_mapping_hat_bpm_und_key(self, exporter):
     info = exporter.get_format_info()
     assert "bpm" in info["metadata_mapping"]
     assert "key" in info["metadata_mapping"]
 
-  def test_kompatibel_mit_rekordbox_versionen(self):
-    exporter = make_exporter()
+  def test_kompatibel_mit_rekordbox_versionen(self, exporter):
     info = exporter.get_format_info()
     compatible = info["compatible_with"]
     assert any("5" in v for v in compatible)
@@ -210,88 +199,77 @@ class TestRekordboxFormatInfo:
 class TestRekordboxExport:
   """export() End-to-End mit FakeRekordboxXml."""
 
-  def test_export_erstellt_datei(self, tmp_path):
-    playlist = [make_track(title="T1", bpm=128.0, camelotCode="8A", duration=300.0)]
-    out = str(tmp_path / "test.xml")
-    make_export(playlist, out)
+  @pytest.mark.parametrize(
+    "patched_rekordbox", [PersistingRekordboxXml], indirect=True
+  )
+  def test_export_erstellt_datei(self, mkout, patched_rekordbox):
+    playlist = [make_shared_track(title="T1", bpm=128.0, camelotCode="8A", duration=300.0)]
+    out = mkout("test.xml")
+    RekordboxXMLExporter().export(playlist, out)
     assert os.path.exists(out)
 
-  def test_export_leere_playlist_raises(self, tmp_path):
-    out = str(tmp_path / "empty.xml")
-    with patch("hpg_core.exporters.rekordbox_xml_exporter.PYREKORDBOX_AVAILABLE", True):
-      with patch(
-        "hpg_core.exporters.rekordbox_xml_exporter.RekordboxXml",
-        FakeRekordboxXml,
-        create=True,
-      ):
-        exporter = RekordboxXMLExporter()
-        with pytest.raises(ValueError):
-          exporter.export([], out)
-
-  def test_export_korrekte_anzahl_tracks(self, tmp_path):
+  def test_export_leere_playlist_raises(self, mkout, patched_rekordbox):
+    out = mkout("empty.xml")
+    with pytest.raises(ValueError):
+      RekordboxXMLExporter().export([], out)
+
+  def test_export_korrekte_anzahl_tracks(self, mkout, patched_rekordbox):
     playlist = [
-      make_track(title=f"T{i}", bpm=128.0, camelotCode="8A", duration=300.0)
+      make_shared_track(title=f"T{i}", bpm=128.0, camelotCode="8A", duration=300.0)
       for i in range(3)
     ]
-    out = str(tmp_path / "multi.xml")
-    fake_xml = FakeRekordboxXml()
-    make_export(playlist, out, fake_xml=fake_xml)
+    out = mkout("multi.xml")
+    RekordboxXMLExporter().export(playlist, out)
+    fake_xml = patched_rekordbox.last_instance()
     assert len(fake_xml.tracks) == 3
 
-  def test_export_setzt_bpm_metadata(self, tmp_path):
-    playlist = [make_track(title="T1", bpm=133.5, camelotCode="8A", duration=300.0)]
-    out = str(tmp_path / "bpm.xml")
-    fake_xml = FakeRekordboxXml()
-    make_export(playlist, out, fake_xml=fake_xml)
-    assert fake_xml.tracks[0].get("AverageBpm") == "133.50"
-
-  def test_export_setzt_tonality_key(self, tmp_path):
-    playlist = [make_track(title="T1", bpm=128.0, camelotCode="8A", duration=300.0)]
-    out = str(tmp_path / "key.xml")
-    fake_xml = FakeRekordboxXml()
-    make_export(playlist, out, fake_xml=fake_xml)
-    assert fake_xml.tracks[0].get("Tonality") == "Am"
-
-  def test_export_setzt_artist_und_title(self, tmp_path):
-    playlist = [make_track(title="Night Drive", artist="Djane Cosmic", bpm=128.0)]
-    out = str(tmp_path / "meta.xml")
-    fake_xml = FakeRekordboxXml()
-    make_export(playlist, out, fake_xml=fake_xml)
-    assert fake_xml.tracks[0].get("Artist") == "Djane Cosmic"
-    assert fake_xml.tracks[0].get("Name") == "Night Drive"
-
-  def test_export_setzt_track_id(self, tmp_path):
+  def test_export_setzt_track_metadata(self, mkout, patched_rekordbox):
+    """Ein Export-Durchlauf prueft BPM, Tonality, Artist/Name und TrackIDs."""
     playlist = [
-      make_track(title="T1"),
-      make_track(title="T2"),
+      make_shared_track(
+        title="Night Drive", artist="Djane Cosmic",
+        bpm=133.5, camelotCode="8A", duration=300.0,
+      ),
+      make_shared_track(title="T2"),
     ]
-    out = str(tmp_path / "ids.xml")
-    fake_xml = FakeRekordboxXml()
-    make_export(playlist, out, fake_xml=fake_xml)
+    RekordboxXMLExporter().export(playlist, mkout("meta.xml"))
+    fake_xml = patched_rekordbox.last_instance()
+    first = fake_xml.tracks[0]
+    assert first.get("AverageBpm") == "133.50"
+    assert first.get("Tonality") == "Am"
+    assert first.get("Artist") == "Djane Cosmic"
+    assert first.get("Name") == "Night Drive"
     # TrackIDs beginnen bei 1
-    assert fake_xml.tracks[0].get("TrackID") == "1"
+    assert first.get("TrackID") == "1"
     assert fake_xml.tracks[1].get("TrackID") == "2"
 
-  def test_export_ohne_bpm_kein_fehler(self, tmp_path):
+  @pytest.mark.parametrize("bpm,expected", BPM_FORMAT_CASES)
+  def test_export_bpm_zwei_nachkommastellen(self, mkout, patched_rekordbox, bpm, expected):
+    playlist = [make_shared_track(title="T1", bpm=bpm)]
+    RekordboxXMLExporter().export(playlist, mkout(f"bpm_{expected}.xml"))
+    fake_xml = patched_rekordbox.last_instance()
+    assert fake_xml.tracks[0].get("AverageBpm") == expected
+
+  def test_export_ohne_bpm_kein_fehler(self, mkout, patched_rekordbox):
     """Track ohne BPM darf nicht crashen."""
-    playlist = [make_track(title="T1", bpm=None, camelotCode="8A", duration=300.0)]
-    out = str(tmp_path / "nobpm.xml")
+    playlist = [make_shared_track(title="T1", bpm=None, camelotCode="8A", duration=300.0)]
+    out = mkout("nobpm.xml")
     # Kein Exception erwartet
-    make_export(playlist, out)
+    RekordboxXMLExporter().export(playlist, out)
 
-  def test_export_ohne_camelot_kein_fehler(self, tmp_path):
+  def test_export_ohne_camelot_kein_fehler(self, mkout, patched_rekordbox):
     """Track ohne Camelot-Code darf nicht crashen."""
-    playlist = [make_track(title="T1", bpm=128.0, camelotCode=None, duration=300.0)]
-    out = str(tmp_path / "nokey.xml")
+    playlist = [make_shared_track(title="T1", bpm=128.0, camelotCode=None, duration=300.0)]
+    out = mkout("nokey.xml")
     # Kein Exception erwartet
-    make_export(playlist, out)
+    RekordboxXMLExporter().export(playlist, out)
 
-  def test_export_erstellt_playlist_eintrag(self, tmp_path):
+  def test_export_erstellt_playlist_eintrag(self, mkout, patched_rekordbox):
     """Playlist wird in FakeRekordboxXml angelegt."""
-    playlist = [make_track(title="T1", bpm=128.0)]
-    out = str(tmp_path / "pl.xml")
-    fake_xml = FakeRekordboxXml()
-    make_export(playlist, out, fake_xml=fake_xml)
+    playlist = [make_shared_track(title="T1", bpm=128.0)]
+    out = mkout("pl.xml")
+    RekordboxXMLExporter().export(playlist, out)
+    fake_xml = patched_rekordbox.last_instance()
     # Mindestens eine Playlist angelegt
     assert len(fake_xml.playlists) > 0
 
@@ -301,58 +279,49 @@ class TestRekordboxExport:
 class TestRekordboxCuePunkte:
   """_add_cue_points Tests."""
 
-  def test_cue_points_werden_hinzugefuegt(self, tmp_path):
-    playlist = [make_track(
+  def test_cue_points_werden_hinzugefuegt(self, mkout, patched_rekordbox):
+    playlist = [make_shared_track(
       title="T1", bpm=128.0, camelotCode="8A", duration=300.0,
       mix_in_point=30.0, mix_out_point=270.0,
     )]
-    out = str(tmp_path / "cues.xml")
-    fake_xml = FakeRekordboxXml()
-    make_export(playlist, out, fake_xml=fake_xml)
-    cue_names = [c["name"] for c in fake_xml.cues]
-    assert "MIX IN" in cue_names
-    assert "MIX OUT" in cue_names
-
-  def test_keine_cues_wenn_mix_points_null(self, tmp_path):
+    out = mkout("cues.xml")
+    RekordboxXMLExporter().export(playlist, out)
+    fake_xml = patched_rekordbox.last_instance()
+    assert "MIX IN" in fake_xml.cue_names
+    assert "MIX OUT" in fake_xml.cue_names
+
+  def test_keine_cues_wenn_mix_points_null(self, mkout, patched_rekordbox):
     """Keine Cue-Points wenn mix_in/out = 0."""
-    playlist = [make_track(
+    playlist = [make_shared_track(
       title="T1", bpm=128.0, camelotCode="8A", duration=300.0,
       mix_in_point=0.0, mix_out_point=0.0,
     )]
-    out = str(tmp_path / "nocues.xml")
-    fake_xml = FakeRekordboxXml()
-    make_export(playlist, out, fake_xml=fake_xml)
+    out = mkout("nocues.xml")
+    RekordboxXMLExporter().export(playlist, out)
+    fake_xml = patched_rekordbox.last_instance()
     assert len(fake_xml.cues) == 0
 
-  def test_cue_exception_wird_geloggt_kein_crash(self, tmp_path):
+  @pytest.mark.parametrize(
+    "patched_rekordbox", [BrokenCueRekordboxXml], indirect=True
+  )
+  def test_cue_exception_wird_geloggt_kein_crash(self, mkout, patched_rekordbox):
     """Fehler in _add_cue_points darf Export nicht verhindern."""
-
-    class BrokenXml(FakeRekordboxXml):
-      def add_cue(self, *args, **kwargs):
-        raise RuntimeError("Cue error")
-
-    playlist = [make_track(
+    playlist = [make_shared_track(
       title="T1", bpm=128.0, camelotCode="8A", duration=300.0,
       mix_in_point=30.0, mix_out_point=270.0,
     )]
-    out = str(tmp_path / "cueerror.xml")
-    with patch("hpg_core.exporters.rekordbox_xml_exporter.PYREKORDBOX_AVAILABLE", True):
-      with patch(
-        "hpg_core.exporters.rekordbox_xml_exporter.RekordboxXml",
-        BrokenXml,
-        create=True,
-      ):
-        exporter = RekordboxXMLExporter()
-        exporter.export(playlist, out)  # Kein Exception — Fehler wird geloggt
+    out = mkout("cueerror.xml")
+    RekordboxXMLExporter().export(playlist, out)  # Kein Exception — Fehler wird geloggt
 
     assert os.path.exists(out)
 
-  def test_mix_in_cue_zeitstempel(self, tmp_path):
+  def test_mix_in_cue_zeitstempel(self, mkout, patched_rekordbox):
     """Mix-In Cue hat korrekten Zeitstempel."""
-    playlist = [make_track(mix_in_point=45.0, mix_out_point=250.0)]
-    out = str(tmp_path / "cue_time.xml")
-    fake_xml = FakeRekordboxXml()
-    make_export(playlist, out, fake_xml=fake_xml)
+    playlist = [make_shared_track(mix_in_point=45.0, mix_out_point=250.0)]
+    out = mkout("cue_time.xml")
+    RekordboxXMLExporter().export(playlist, out)
+    fake_xml = patched_rekordbox.last_instance()
     mix_in_cues = [c for c in fake_xml.cues if c["name"] == "MIX IN"]
     assert len(mix_in_cues) == 1
-    assert mix_in_cues[0]["time"] == pytest.approx(45.0)
+    # Wert wird unveraendert durchgereicht → exakter Vergleich
+    assert mix_in_cues[0]["time"] == 45.0
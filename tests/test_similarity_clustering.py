@@ -4,6 +4,8 @@ Prueft Distanzberechnung, Track-Suche und k-Means Clustering.
 """
 import pytest
 import math
+import warnings
+import numpy as np
 from hpg_core.playlist import (
     mfcc_distance,
     find_similar_tracks,
@@ -146,6 +148,29 @@ class TestFindSimilarTracks:
     titles = [r[0].title for r in result]
     assert titles == ["Near", "Mid", "Far"]
 
+  def test_ties_keep_candidate_order(self):
+    """Gleichstand an der k-ten Position: fruehere Kandidaten gewinnen."""
+    ref = _make_track(title="Ref", mfcc=[0.0])
+    dists = [3, 2, 3, 3, 3, 3, 1, 2, 1, 3, 1, 1, 1, 2, 2, 1, 2, 3, 1]
+    candidates = [
+      _make_track(title=f"C{i}", mfcc=[float(d)]) for i, d in enumerate(dists)
+    ]
+    results = find_similar_tracks(ref, candidates, max_results=8)
+    expected = sorted(range(len(dists)), key=lambda i: dists[i])[:8]
+    assert [t.title for t, _ in results] == [f"C{i}" for i in expected]
+
+  def test_duplicate_fingerprint_is_exactly_zero(self):
+    """Echte MFCC-Groessenordnung (c0 ~ -400): Duplikat hat Distanz 0.0 und steht vorn."""
+    rng = np.random.default_rng(7)
+    fp = [-412.7] + list(rng.normal(0.0, 40.0, 12))
+    ref = _make_track(title="Ref", mfcc=fp)
+    near = _make_track(title="Near", mfcc=[fp[0] + 1e-3] + fp[1:])
+    dup = _make_track(title="Dup", mfcc=list(fp))
+    result = find_similar_tracks(ref, [near, dup])
+    assert result[0][0].title == "Dup"
+    assert result[0][1] == 0.0
+    assert result[1][1] == pytest.approx(mfcc_distance(fp, near.mfcc_fingerprint))
+
   def test_returns_tuples(self):
     ref = _make_track(title="Ref", mfcc=[0.0])
     other = _make_track(title="Other", mfcc=[3.0])
@@ -230,6 +255,26 @@ class TestClusterTracks:
     )
     assert has_no_mfcc_cluster
 
+  def test_mixed_mfcc_lengths(self):
+    """Abweichende MFCC-Dimensionen crashen nicht und landen im Extra-Cluster."""
+    tracks = [
+      _make_track(title=f"T{i}", mfcc=[float(i), 0.0]) for i in range(5)
+    ]
+    odd = _make_track(title="Odd", mfcc=[1.0, 2.0, 3.0])
+    clusters = cluster_tracks_by_similarity(tracks + [odd], n_clusters=2)
+    assert sum(len(c) for c in clusters) == 6
+    assert clusters[-1] == [odd]
+
+  def test_empty_cluster_warning_filtered(self):
+    """Doppelte Start-Centroids lassen Cluster leer: keine Warnung, leere Cluster entfallen."""
+    fps = [[0.0, 0.0], [0.0, 0.0], [5.0, 5.0], [5.0, 5.0], [9.0, 9.0]]
+    tracks = [_make_track(title=f"T{i}", mfcc=fp) for i, fp in enumerate(fps)]
+    with warnings.catch_warnings(record=True) as caught:
+      clusters = cluster_tracks_by_similarity(tracks, n_clusters=4)
+    assert not [w for w in caught if "clusters is empty" in str(w.message)]
+    assert all(clusters)
+    assert sum(len(c) for c in clusters) == 5
+
   def test_single_cluster(self):
     tracks = [
       _make_track(title=f"T{i}", mfcc=[float(i), 0.0]) for i in range(5)
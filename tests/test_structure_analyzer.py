@@ -2,8 +2,11 @@
 Tests fuer hpg_core.structure_analyzer - Track-Struktur-Erkennung fuer DJ Brain.
 Testet Sektions-Erkennung, Boundary-Detection, Quantisierung und Labeling.
 """
+import functools
+
 import pytest
 import numpy as np
+import librosa
 
 from hpg_core.structure_analyzer import (
   TrackSection,
@@ -14,33 +17,52 @@ from hpg_core.structure_analyzer import (
   MIN_SECTION_DURATION,
   ENERGY_HIGH_THRESHOLD,
   ENERGY_LOW_THRESHOLD,
+  NUMBA_AVAILABLE,
+  MFCC_BLOCK_SECONDS,
+  MFCC_N_FFT,
+  _checkerboard_novelty,
+  _compute_mfcc,
   _compute_novelty_curve,
   _pick_boundaries,
   _quantize_to_bars,
   _compute_section_energy,
+  _compute_section_profiles,
   _compute_energy_trend,
   _label_sections,
   analyze_structure,
 )
-from hpg_core.config import METER
+from hpg_core.config import HOP_LENGTH, METER
 
 
 # === Hilfsfunktionen fuer synthetische Audio-Signale ===
 
+# Die Helfer liefern gecachte, schreibgeschuetzte Arrays: viele Tests fragen
+# dieselben (sr, duration, ...) Kombinationen an und lesen die Signale nur.
+
+@functools.lru_cache(maxsize=64)
 def _make_silence(sr: int, duration: float) -> np.ndarray:
   """Erzeugt Stille."""
-  return np.zeros(int(sr * duration), dtype=np.float32)
+  y = np.zeros(int(sr * duration), dtype=np.float32)
+  y.flags.writeable = False
+  return y
 
 
+@functools.lru_cache(maxsize=64)
 def _make_tone(sr: int, duration: float, freq: float = 440.0, amplitude: float = 0.3) -> np.ndarray:
   """Erzeugt einen Sinuston."""
   t = np.linspace(0, duration, int(sr * duration), endpoint=False)
-  return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+  y = (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+  y.flags.writeable = False
+  return y
 
 
-def _make_noise(sr: int, duration: float, amplitude: float = 0.3) -> np.ndarray:
-  """Erzeugt weisses Rauschen."""
-  return (amplitude * np.random.randn(int(sr * duration))).astype(np.float32)
+@functools.lru_cache(maxsize=64)
+def _make_noise(sr: int, duration: float, amplitude: float = 0.3, seed: int = 0) -> np.ndarray:
+  """Erzeugt weisses Rauschen (reproduzierbar ueber seed)."""
+  rng = np.random.default_rng(seed)
+  y = (amplitude * rng.standard_normal(int(sr * duration))).astype(np.float32)
+  y.flags.writeable = False
+  return y
 
 
 def _make_structured_track(sr: int = 22050) -> np.ndarray:
@@ -54,11 +76,12 @@ def _make_structured_track(sr: int = 22050) -> np.ndarray:
   """
   intro = _make_tone(sr, 10.0, freq=220, amplitude=0.05)
   build = np.linspace(0.05, 0.3, int(sr * 10)) * np.sin(2 * np.pi * 330 * np.linspace(0, 10, int(sr * 10)))
-  drop = _make_noise(sr, 20.0, amplitude=0.35) + _make_tone(sr, 20.0, freq=100, amplitude=0.25)
+  drop = _make_noise(sr, 20.0, amplitude=0.35, seed=0) + _make_tone(sr, 20.0, freq=100, amplitude=0.25)
   breakdown = _make_tone(sr, 10.0, freq=440, amplitude=0.15)
   outro = _make_tone(sr, 10.0, freq=220, amplitude=0.04)
 
   y = np.concatenate([intro, build.astype(np.float32), drop, breakdown, outro])
+  y.flags.writeable = False  # Wird von mehreren Tests geteilt
   return y
 
 
@@ -133,20 +156,15 @@ class TestTrackStructure:
 class TestGenrePhraseUnits:
   """Prueft die Genre-Phrase-Unit-Zuordnung."""
 
-  def test_psytrance_16_bars(self):
-    assert GENRE_PHRASE_UNITS["Psytrance"] == 16
-
-  def test_tech_house_8_bars(self):
-    assert GENRE_PHRASE_UNITS["Tech House"] == 8
-
-  def test_progressive_8_bars(self):
-    assert GENRE_PHRASE_UNITS["Progressive"] == 8
-
-  def test_melodic_techno_8_bars(self):
-    assert GENRE_PHRASE_UNITS["Melodic Techno"] == 8
-
-  def test_unknown_8_bars(self):
-    assert GENRE_PHRASE_UNITS["Unknown"] == 8
+  @pytest.mark.parametrize("genre,expected", [
+    ("Psytrance", 16),
+    ("Tech House", 8),
+    ("Progressive", 8),
+    ("Melodic Techno", 8),
+    ("Unknown", 8),
+  ])
+  def test_phrase_unit(self, genre, expected):
+    assert GENRE_PHRASE_UNITS[genre] == expected
 
   def test_all_genres_defined(self):
     expected = {
@@ -300,6 +318,46 @@ class TestComputeEnergyTrend:
     assert trend == "stable"
 
 
+class TestComputeSectionProfiles:
+  """Batch-Variante muss pro Sektion _compute_section_energy/_compute_energy_trend entsprechen."""
+
+  @staticmethod
+  def _assert_matches_single(y, sr, boundaries, duration):
+    energies, trends = _compute_section_profiles(y, sr, boundaries, duration)
+    ends = list(boundaries[1:]) + [duration]
+    assert len(energies) == len(trends) == len(boundaries)
+    for start, end, energy, trend in zip(boundaries, ends, energies, trends):
+      assert energy == pytest.approx(_compute_section_energy(y, sr, start, end), abs=1e-3)
+      assert trend == _compute_energy_trend(y, sr, start, end)
+
+  def test_structured_track(self):
+    sr = 22050
+    y = _make_structured_track(sr)
+    self._assert_matches_single(y, sr, [0.0, 10.0, 20.0, 40.0, 50.0], 60.0)
+
+  def test_uneven_boundaries(self):
+    sr = 22050
+    y = _make_structured_track(sr)
+    self._assert_matches_single(y, sr, [0.0, 3.3, 17.9, 18.4, 31.05, 55.5], 60.0)
+
+  def test_degenerate_sections(self):
+    """Null-lange, doppelte, zu kurze und ueber das Signalende reichende Sektionen."""
+    sr = 22050
+    y = _make_structured_track(sr)
+    boundaries = [0.0, 0.0, 5.0, 5.0, 5.2, 59.99, 60.0, 61.0, 70.0]
+    self._assert_matches_single(y, sr, boundaries, 60.0)
+
+  def test_silence_and_silent_start(self):
+    sr = 22050
+    y = np.concatenate([_make_silence(sr, 5.0), _make_tone(sr, 5.0), _make_silence(sr, 5.0)])
+    self._assert_matches_single(y, sr, [0.0, 2.5, 10.0], 15.0)
+
+  def test_empty_signal(self):
+    energies, trends = _compute_section_profiles(np.zeros(0, dtype=np.float32), 22050, [0.0, 5.0], 10.0)
+    assert energies == [0.0, 0.0]
+    assert trends == ["stable", "stable"]
+
+
 # === Label Sections ===
 
 class TestLabelSections:
@@ -430,83 +488,142 @@ class TestComputeNoveltyCurve:
     novelty, times = _compute_novelty_curve(y, sr)
     assert np.all(np.diff(times) > 0)
 
+  def test_checkerboard_matches_block_means(self):
+    """Band-Implementierung == direkte Blockmittelwerte entlang der Diagonale."""
+    rng = np.random.default_rng(0)
+    rec = rng.random((60, 60))
+    rec = (rec + rec.T) / 2.0
+    k = 7
+    expected = np.zeros(60)
+    for i in range(k, 60 - k):
+      self_sim = (rec[i - k:i, i - k:i].mean() + rec[i:i + k, i:i + k].mean()) / 2.0
+      expected[i] = max(0.0, self_sim - rec[i - k:i, i:i + k].mean())
+    np.testing.assert_allclose(_checkerboard_novelty(rec, k), expected, atol=1e-12)
+
+  @pytest.mark.skipif(not NUMBA_AVAILABLE, reason="numba nicht installiert")
+  @pytest.mark.parametrize("n, k", [(60, 7), (33, 16), (32, 16), (200, 1), (90, 12)])
+  def test_checkerboard_fallback_matches_numba(self, n, k):
+    """NumPy-Fallback und numba-Kernel muessen synchron bleiben."""
+    from hpg_core.structure_analyzer import _checkerboard_novelty_nb
+    rng = np.random.default_rng(n * 31 + k)
+    rec = rng.random((n, n))
+    rec = (rec + rec.T) / 2.0
+    np.testing.assert_allclose(
+      _checkerboard_novelty(rec, k), _checkerboard_novelty_nb(rec, k), atol=1e-9
+    )
+
+class TestComputeMfcc:
+  """Eigene MFCC-Pipeline muss librosa.feature.mfcc entsprechen."""
+
+  @pytest.mark.parametrize("n_samples", [
+    MFCC_N_FFT // 2,  # kuerzer als n_fft
+    22050 * 4,  # einige Sekunden
+    int(22050 * (MFCC_BLOCK_SECONDS + 5.0)),  # mehr als ein FFT-Block
+  ], ids=["shorter_than_n_fft", "few_seconds", "multiple_blocks"])
+  def test_matches_librosa(self, n_samples):
+    sr = 22050
+    hop = HOP_LENGTH
+    y = _make_noise(sr, n_samples / sr)
+    expected = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13, hop_length=hop)
+    result = _compute_mfcc(y, sr, hop)
+    assert result.shape == expected.shape
+    np.testing.assert_allclose(result, expected, atol=1e-4)
+
 
 # === Main Function: analyze_structure ===
 
 class TestAnalyzeStructure:
   """Prueft die Hauptfunktion analyze_structure()."""
 
-  @pytest.fixture
+  # Klassenweit geteilt: die Tests lesen das Audio nur (Arrays sind read-only)
+  @pytest.fixture(scope="class")
   def simple_audio(self):
     """10-Sekunden Ton bei 22050 Hz."""
     sr = 22050
     y = _make_tone(sr, 10.0, amplitude=0.2)
     return y, sr
 
-  @pytest.fixture
+  @pytest.fixture(scope="class")
   def structured_audio(self):
     """60-Sekunden Track mit klaren Sektionen."""
     sr = 22050
     y = _make_structured_track(sr)
     return y, sr
 
-  def test_returns_track_structure(self, simple_audio):
+  @pytest.fixture(scope="class")
+  def analyze(self):
+    """analyze_structure mit klassenweitem Memo fuer die geteilten Fixture-Signale.
+
+    Der Key enthaelt id(y); das Memo haelt y selbst fest, damit die id
+    waehrend der Klasse nicht neu vergeben wird. Die Tests lesen die
+    Ergebnisse nur.
+    """
+    memo = {}
+
+    def run(y, sr, bpm, genre="Unknown"):
+      key = (id(y), sr, bpm, genre)
+      if key not in memo:
+        memo[key] = (y, analyze_structure(y, sr, bpm=bpm, genre=genre))
+      return memo[key][1]
+
+    return run
+
+  def test_returns_track_structure(self, simple_audio, analyze):
     y, sr = simple_audio
-    result = analyze_structure(y, sr, bpm=128.0)
+    result = analyze(y, sr, bpm=128.0)
     assert isinstance(result, TrackStructure)
 
-  def test_has_sections(self, simple_audio):
+  def test_has_sections(self, simple_audio, analyze):
     y, sr = simple_audio
-    result = analyze_structure(y, sr, bpm=128.0)
+    result = analyze(y, sr, bpm=128.0)
     assert len(result.sections) >= 1
 
-  def test_sections_are_track_sections(self, simple_audio):
+  def test_sections_are_track_sections(self, simple_audio, analyze):
     y, sr = simple_audio
-    result = analyze_structure(y, sr, bpm=128.0)
+    result = analyze(y, sr, bpm=128.0)
     for section in result.sections:
       assert isinstance(section, TrackSection)
 
-  def test_sections_cover_full_track(self, simple_audio):
+  def test_sections_cover_full_track(self, simple_audio, analyze):
     """Sektionen decken den ganzen Track ab (Start=0, Ende=Duration)."""
     y, sr = simple_audio
-    result = analyze_structure(y, sr, bpm=128.0)
+    result = analyze(y, sr, bpm=128.0)
     if result.sections:
       assert result.sections[0].start_time == 0.0
       # Letzte Sektion endet bei Duration (ungefaehr)
-      import librosa as lr
-      duration = lr.get_duration(y=y, sr=sr)
+      duration = y.shape[-1] / sr
       assert abs(result.sections[-1].end_time - duration) < 1.0
 
-  def test_no_overlapping_sections(self, simple_audio):
+  def test_no_overlapping_sections(self, simple_audio, analyze):
     """Sektionen ueberlappen nicht."""
     y, sr = simple_audio
-    result = analyze_structure(y, sr, bpm=128.0)
+    result = analyze(y, sr, bpm=128.0)
     for i in range(len(result.sections) - 1):
       assert result.sections[i].end_time <= result.sections[i + 1].start_time + 0.01
 
-  def test_total_bars_positive(self, simple_audio):
+  def test_total_bars_positive(self, simple_audio, analyze):
     y, sr = simple_audio
-    result = analyze_structure(y, sr, bpm=128.0)
+    result = analyze(y, sr, bpm=128.0)
     assert result.total_bars > 0
 
-  def test_phrase_unit_default_8(self, simple_audio):
+  def test_phrase_unit_default_8(self, simple_audio, analyze):
     y, sr = simple_audio
-    result = analyze_structure(y, sr, bpm=128.0)
+    result = analyze(y, sr, bpm=128.0)
     assert result.phrase_unit == 8
 
-  def test_psytrance_phrase_unit_16(self, simple_audio):
+  def test_psytrance_phrase_unit_16(self, simple_audio, analyze):
     y, sr = simple_audio
-    result = analyze_structure(y, sr, bpm=142.0, genre="Psytrance")
+    result = analyze(y, sr, bpm=142.0, genre="Psytrance")
     assert result.phrase_unit == 16
 
-  def test_tech_house_phrase_unit_8(self, simple_audio):
+  def test_tech_house_phrase_unit_8(self, simple_audio, analyze):
     y, sr = simple_audio
-    result = analyze_structure(y, sr, bpm=128.0, genre="Tech House")
+    result = analyze(y, sr, bpm=128.0, genre="Tech House")
     assert result.phrase_unit == 8
 
-  def test_unknown_genre_phrase_unit_8(self, simple_audio):
+  def test_unknown_genre_phrase_unit_8(self, simple_audio, analyze):
     y, sr = simple_audio
-    result = analyze_structure(y, sr, bpm=128.0, genre="Unknown")
+    result = analyze(y, sr, bpm=128.0, genre="Unknown")
     assert result.phrase_unit == 8
 
   def test_zero_bpm_returns_empty(self):
@@ -524,24 +641,35 @@ class TestAnalyzeStructure:
     result = analyze_structure(y, sr, bpm=128.0)
     assert result.sections == []
 
-  def test_section_energies_between_0_and_100(self, structured_audio):
+  def test_silent_audio_single_main_section(self):
+    """Stille -> ein einziger "main"-Abschnitt ueber den ganzen Track."""
+    sr = 22050
+    y = _make_silence(sr, 20.0)
+    result = analyze_structure(y, sr, bpm=120.0)
+    assert [s.label for s in result.sections] == ["main"]
+    assert result.sections[0].start_time == 0.0
+    assert result.sections[0].end_time == pytest.approx(20.0, abs=0.1)
+    assert result.sections[0].avg_energy == 0.0
+    assert result.total_bars == 10
+
+  def test_section_energies_between_0_and_100(self, structured_audio, analyze):
     y, sr = structured_audio
-    result = analyze_structure(y, sr, bpm=128.0)
+    result = analyze(y, sr, bpm=128.0)
     for section in result.sections:
       assert 0.0 <= section.avg_energy <= 100.0
 
-  def test_section_bars_non_negative(self, structured_audio):
+  def test_section_bars_non_negative(self, structured_audio, analyze):
     y, sr = structured_audio
-    result = analyze_structure(y, sr, bpm=128.0)
+    result = analyze(y, sr, bpm=128.0)
     for section in result.sections:
       assert section.start_bar >= 0
       assert section.end_bar >= section.start_bar
 
-  def test_valid_labels_only(self, structured_audio):
+  def test_valid_labels_only(self, structured_audio, analyze):
     """Alle Sektionen haben gueltige Labels."""
     valid = {"intro", "build", "drop", "breakdown", "outro", "main"}
     y, sr = structured_audio
-    result = analyze_structure(y, sr, bpm=128.0)
+    result = analyze(y, sr, bpm=128.0)
     for section in result.sections:
       assert section.label in valid, f"Ungueltiges Label: {section.label}"
 
@@ -3,9 +3,13 @@ Tests fuer Transition Type Prediction.
 Prueft ob der optimale Transition-Typ korrekt vorhergesagt wird
 basierend auf BPM-Relation, Energie-Delta, Harmonie und Genre.
 """
+import functools
+from typing import Optional
+
 import pytest
 from unittest.mock import patch
 from hpg_core.playlist import (
+    compute_transition_recommendations,
     predict_transition_type,
 )
 from hpg_core.theme import (
@@ -17,14 +21,19 @@ from hpg_core.models import Track
 
 # === Hilfsfunktionen ===
 
+@functools.lru_cache(maxsize=256)
 def _make_track(
     title: str = "Test",
     bpm: float = 128.0,
     camelot: str = "8A",
     energy: int = 50,
-    genre: str = "Unknown",
+    genre: Optional[str] = "Unknown",
 ) -> Track:
-  """Erstellt einen minimalen Track fuer Transition-Tests."""
+  """Erstellt einen minimalen Track fuer Transition-Tests.
+
+  Geteilt pro Parameter-Kombination: predict_transition_type liest Tracks
+  nur, Tests duerfen die zurueckgegebenen Tracks nicht veraendern.
+  """
   return Track(
     filePath="test.mp3",
     fileName="test.mp3",
@@ -36,33 +45,92 @@ def _make_track(
   )
 
 
+@functools.lru_cache(maxsize=512)
+def _predict_cached(
+    from_track: tuple[float, str, int, Optional[str]],
+    to_track: tuple[float, str, int, Optional[str]],
+    bpm_tolerance: float = 3.0,
+) -> str:
+  """predict_transition_type fuer (bpm, camelot, energy, genre)-Tupel, gecacht.
+
+  Gleiche Track-Paare aus verschiedenen Testfaellen werden nur einmal bewertet.
+  """
+  return predict_transition_type(
+    _make_track("Test", *from_track),
+    _make_track("Test", *to_track),
+    bpm_tolerance=bpm_tolerance,
+  )
+
+
+# Standard-Track (128 BPM, 8A, Energie 50, Genre "Unknown"), einmal beim Import erzeugt
+_DEFAULT_TRACK = _make_track()
+
+
+# === Testfall-Tabellen ===
+
+# (bpm1, bpm2, camelot): exaktes Half/Double-Time-Verhaeltnis
+_HALFTIME_CASES = [
+  pytest.param(140.0, 70.0, "8A", id="half_time"),
+  pytest.param(70.0, 140.0, "8A", id="double_time"),
+  pytest.param(174.0, 87.0, "5A", id="dnb_half_time"),
+  pytest.param(128.0, 64.0, "8A", id="128_to_64"),
+]
+
+# Zulaessige Ergebnisse, wo mehrere Regeln greifen koennen
+_BREAKDOWN_OR_COLD = frozenset({"breakdown_bridge", "cold_cut"})
+_ENERGY_DROP_BAD_HARMONY = frozenset({"breakdown_bridge", "echo_out", "cold_cut"})
+_MODERATE_ENERGY_DIFF = frozenset({"breakdown_bridge", "filter_ride", "echo_out"})
+_MODERATE_SIMILAR_ENERGY = frozenset({"filter_ride", "smooth_blend", "breakdown_bridge"})
+_SAME_TRACK = frozenset({"smooth_blend", "filter_ride"})
+
+# Genres, die bei perfekter Harmonie filter_ride statt smooth_blend ergeben
+_MELODIC_GENRES = frozenset({"Melodic Techno", "Progressive", "Trance", "Deep House"})
+
+# (genre, bpm, energy): genre-typisches Tempo/Energie-Niveau je melodischem Genre
+_MELODIC_CASES = [
+  pytest.param("Melodic Techno", 128.0, 50, id="melodic_techno"),
+  pytest.param("Progressive", 128.0, 50, id="progressive"),
+  pytest.param("Trance", 138.0, 50, id="trance"),
+  pytest.param("Deep House", 122.0, 45, id="deep_house"),
+]
+
+# (genre, bpm1, energy1, bpm2, energy2): harte Genres, gute Harmonie
+_BASS_SWAP_CASES = [
+  pytest.param("Tech House", 128.0, 60, 129.0, 65, id="tech_house"),
+  pytest.param("Techno", 135.0, 70, 136.0, 65, id="techno"),
+  pytest.param("Minimal", 126.0, 55, 126.0, 50, id="minimal"),
+  pytest.param("Drum & Bass", 174.0, 75, 174.0, 70, id="dnb"),
+]
+
+
+# (from_track, to_track) als (bpm, camelot, energy, genre): Grenzwerte, die nicht crashen duerfen
+_EDGE_CASES = [
+  pytest.param((0.0, "8A", 50, "Unknown"), (128.0, "8A", 50, "Unknown"), id="zero_bpm"),
+  pytest.param((128.0, "8A", 50, ""), (128.0, "8A", 50, ""), id="no_genre"),
+  pytest.param((128.0, "8A", 50, None), (128.0, "8A", 50, None), id="none_genre"),
+  pytest.param((128.0, "8A", 0, "Unknown"), (128.0, "8A", 100, "Unknown"), id="extreme_energy"),
+  pytest.param((200.0, "8A", 50, "Unknown"), (200.0, "8A", 50, "Unknown"), id="very_high_bpm"),
+  pytest.param((60.0, "8A", 50, "Unknown"), (60.0, "8A", 50, "Unknown"), id="very_low_bpm"),
+]
+
+
 # === Grundlegende Rueckgabewerte ===
 
 class TestTransitionTypeBasics:
   """Grundlegende Tests fuer predict_transition_type."""
 
   def test_returns_string(self):
-    t1 = _make_track()
-    t2 = _make_track()
-    result = predict_transition_type(t1, t2)
+    result = predict_transition_type(_DEFAULT_TRACK, _DEFAULT_TRACK)
     assert isinstance(result, str)
 
   def test_returns_known_type(self):
     """Ergebnis muss ein bekannter Transition-Typ sein."""
-    t1 = _make_track()
-    t2 = _make_track()
-    result = predict_transition_type(t1, t2)
+    result = predict_transition_type(_DEFAULT_TRACK, _DEFAULT_TRACK)
     assert result in TRANSITION_TYPE_LABELS
 
-  def test_all_labels_have_descriptions(self):
-    """Jeder Label-Key hat auch eine Beschreibung."""
-    for key in TRANSITION_TYPE_LABELS:
-      assert key in TRANSITION_TYPE_DESCRIPTIONS, f"Missing description for {key}"
-
-  def test_all_descriptions_have_labels(self):
-    """Jeder Description-Key hat auch ein Label."""
-    for key in TRANSITION_TYPE_DESCRIPTIONS:
-      assert key in TRANSITION_TYPE_LABELS, f"Missing label for {key}"
+  def test_label_description_keys_match(self):
+    """Jeder Label-Key hat eine Beschreibung und umgekehrt."""
+    assert TRANSITION_TYPE_LABELS.keys() == TRANSITION_TYPE_DESCRIPTIONS.keys()
 
 
 # === Regel 1: Halftime Switch ===
@@ -70,29 +138,13 @@ class TestTransitionTypeBasics:
 class TestHalftimeSwitch:
   """Tests fuer Half/Double-Time Erkennung."""
 
-  def test_exact_half_time(self):
-    """140 BPM -> 70 BPM = halftime_switch."""
-    t1 = _make_track(bpm=140.0, camelot="8A")
-    t2 = _make_track(bpm=70.0, camelot="8A")
-    assert predict_transition_type(t1, t2) == "halftime_switch"
-
-  def test_exact_double_time(self):
-    """70 BPM -> 140 BPM = halftime_switch."""
-    t1 = _make_track(bpm=70.0, camelot="8A")
-    t2 = _make_track(bpm=140.0, camelot="8A")
-    assert predict_transition_type(t1, t2) == "halftime_switch"
-
-  def test_dnb_half_time(self):
-    """174 BPM -> 87 BPM = halftime_switch."""
-    t1 = _make_track(bpm=174.0, camelot="5A")
-    t2 = _make_track(bpm=87.0, camelot="5A")
-    assert predict_transition_type(t1, t2) == "halftime_switch"
-
-  def test_128_to_64(self):
-    """128 BPM -> 64 BPM = halftime_switch."""
-    t1 = _make_track(bpm=128.0, camelot="8A")
-    t2 = _make_track(bpm=64.0, camelot="8A")
-    assert predict_transition_type(t1, t2) == "halftime_switch"
+  @pytest.mark.parametrize("bpm1,bpm2,camelot", _HALFTIME_CASES)
+  def test_halftime_switch(self, bpm1, bpm2, camelot):
+    """BPM-Verhaeltnis 2:1 bzw. 1:2 = halftime_switch."""
+    result = _predict_cached(
+      (bpm1, camelot, 50, "Unknown"), (bpm2, camelot, 50, "Unknown")
+    )
+    assert result == "halftime_switch"
 
 
 # === Regel 2: BPM ausserhalb Toleranz ===
@@ -102,19 +154,19 @@ class TestBpmOutOfTolerance:
 
   def test_large_bpm_diff_good_harmony_breakdown(self):
     """Grosse BPM-Diff + gute Harmonie = breakdown_bridge."""
-    t1 = _make_track(bpm=128.0, camelot="8A")
-    t2 = _make_track(bpm=100.0, camelot="8A")
-    result = predict_transition_type(t1, t2, bpm_tolerance=3.0)
+    result = _predict_cached(
+      (128.0, "8A", 50, "Unknown"), (100.0, "8A", 50, "Unknown"), bpm_tolerance=3.0
+    )
     # BPM diff > 3, but harmony could be high (same key)
     # effective_bpm_diff(128, 100): direct=28, half candidates differ
     # With big diff and some harmony -> breakdown_bridge or cold_cut
-    assert result in ("breakdown_bridge", "cold_cut")
+    assert result in _BREAKDOWN_OR_COLD
 
   def test_large_bpm_diff_bad_harmony_cold_cut(self):
     """Grosse BPM-Diff + schlechte Harmonie = cold_cut."""
-    t1 = _make_track(bpm=128.0, camelot="8A")
-    t2 = _make_track(bpm=100.0, camelot="1B")
-    result = predict_transition_type(t1, t2, bpm_tolerance=3.0)
+    result = _predict_cached(
+      (128.0, "8A", 50, "Unknown"), (100.0, "1B", 50, "Unknown"), bpm_tolerance=3.0
+    )
     assert result == "cold_cut"
 
 
@@ -125,17 +177,17 @@ class TestDropCut:
 
   def test_big_energy_push_good_harmony(self):
     """Grosser Energie-Push + gute Harmonie = drop_cut."""
-    t1 = _make_track(bpm=128.0, camelot="8A", energy=30)
-    t2 = _make_track(bpm=128.0, camelot="8A", energy=80)
     # energy_delta = +50, harmonic_score should be high (same key, same bpm)
-    result = predict_transition_type(t1, t2)
+    result = _predict_cached(
+      (128.0, "8A", 30, "Unknown"), (128.0, "8A", 80, "Unknown")
+    )
     assert result == "drop_cut"
 
   def test_moderate_energy_push_not_drop(self):
     """Moderater Energie-Push (< 26) ist kein drop_cut."""
-    t1 = _make_track(bpm=128.0, camelot="8A", energy=50)
-    t2 = _make_track(bpm=128.0, camelot="8A", energy=70)
-    result = predict_transition_type(t1, t2)
+    result = _predict_cached(
+      (128.0, "8A", 50, "Unknown"), (128.0, "8A", 70, "Unknown")
+    )
     assert result != "drop_cut"
 
 
@@ -146,18 +198,18 @@ class TestEnergyDrop:
 
   def test_big_energy_drop_good_harmony(self):
     """Grosser Energie-Drop + gute Harmonie = echo_out."""
-    t1 = _make_track(bpm=128.0, camelot="8A", energy=80)
-    t2 = _make_track(bpm=128.0, camelot="8A", energy=30)
     # energy_delta = -50, harmonic_score high
-    result = predict_transition_type(t1, t2)
+    result = _predict_cached(
+      (128.0, "8A", 80, "Unknown"), (128.0, "8A", 30, "Unknown")
+    )
     assert result == "echo_out"
 
   def test_big_energy_drop_bad_harmony(self):
     """Grosser Energie-Drop + schlechte Harmonie = breakdown_bridge."""
-    t1 = _make_track(bpm=128.0, camelot="8A", energy=80)
-    t2 = _make_track(bpm=129.0, camelot="1B", energy=30)
-    result = predict_transition_type(t1, t2)
-    assert result in ("breakdown_bridge", "echo_out", "cold_cut")
+    result = _predict_cached(
+      (128.0, "8A", 80, "Unknown"), (129.0, "1B", 30, "Unknown")
+    )
+    assert result in _ENERGY_DROP_BAD_HARMONY
 
 
 # === Regel 5: Smooth Blend / Filter Ride (perfekte Harmonie) ===
@@ -165,40 +217,20 @@ class TestEnergyDrop:
 class TestPerfectHarmony:
   """Tests fuer harmonisch perfekte Uebergaenge."""
 
-  def test_perfect_match_melodic_genre(self):
+  @pytest.mark.parametrize("genre,bpm,energy", _MELODIC_CASES)
+  def test_is_melodic(self, genre, bpm, energy):
     """Perfekte Harmonie + melodisches Genre = filter_ride."""
-    t1 = _make_track(bpm=128.0, camelot="8A", energy=50, genre="Melodic Techno")
-    t2 = _make_track(bpm=128.0, camelot="8A", energy=50, genre="Melodic Techno")
-    result = predict_transition_type(t1, t2)
-    assert result == "filter_ride"
+    track = (bpm, "8A", energy, genre)
+    assert _predict_cached(track, track) == "filter_ride"
+
+  def test_melodic_cases_cover_all_genres(self):
+    """Jedes melodische Genre hat einen Testfall."""
+    assert {case.values[0] for case in _MELODIC_CASES} == _MELODIC_GENRES
 
   def test_perfect_match_non_melodic(self):
     """Perfekte Harmonie + nicht-melodisches Genre = smooth_blend."""
-    t1 = _make_track(bpm=128.0, camelot="8A", energy=50, genre="Unknown")
-    t2 = _make_track(bpm=128.0, camelot="8A", energy=50, genre="Unknown")
-    result = predict_transition_type(t1, t2)
-    assert result == "smooth_blend"
-
-  def test_progressive_is_melodic(self):
-    """Progressive zaehlt als melodisches Genre."""
-    t1 = _make_track(bpm=128.0, camelot="8A", energy=50, genre="Progressive")
-    t2 = _make_track(bpm=128.0, camelot="8A", energy=50, genre="Progressive")
-    result = predict_transition_type(t1, t2)
-    assert result == "filter_ride"
-
-  def test_trance_is_melodic(self):
-    """Trance zaehlt als melodisches Genre."""
-    t1 = _make_track(bpm=138.0, camelot="8A", energy=50, genre="Trance")
-    t2 = _make_track(bpm=138.0, camelot="8A", energy=50, genre="Trance")
-    result = predict_transition_type(t1, t2)
-    assert result == "filter_ride"
-
-  def test_deep_house_is_melodic(self):
-    """Deep House zaehlt als melodisches Genre."""
-    t1 = _make_track(bpm=122.0, camelot="8A", energy=45, genre="Deep House")
-    t2 = _make_track(bpm=122.0, camelot="8A", energy=45, genre="Deep House")
-    result = predict_transition_type(t1, t2)
-    assert result == "filter_ride"
+    track = (128.0, "8A", 50, "Unknown")
+    assert _predict_cached(track, track) == "smooth_blend"
 
 
 # === Regel 6: Bass Swap / Smooth Blend (gute Harmonie) ===
@@ -206,32 +238,12 @@ class TestPerfectHarmony:
 class TestGoodHarmony:
   """Tests fuer gute harmonische Uebergaenge."""
 
-  def test_tech_house_bass_swap(self):
-    """Tech House mit guter Harmonie = bass_swap."""
-    t1 = _make_track(bpm=128.0, camelot="8A", energy=60, genre="Tech House")
-    t2 = _make_track(bpm=129.0, camelot="9A", energy=65, genre="Tech House")
-    result = predict_transition_type(t1, t2)
-    assert result == "bass_swap"
-
-  def test_techno_bass_swap(self):
-    """Techno mit guter Harmonie = bass_swap."""
-    t1 = _make_track(bpm=135.0, camelot="8A", energy=70, genre="Techno")
-    t2 = _make_track(bpm=136.0, camelot="9A", energy=65, genre="Techno")
-    result = predict_transition_type(t1, t2)
-    assert result == "bass_swap"
-
-  def test_minimal_bass_swap(self):
-    """Minimal mit guter Harmonie = bass_swap."""
-    t1 = _make_track(bpm=126.0, camelot="8A", energy=55, genre="Minimal")
-    t2 = _make_track(bpm=126.0, camelot="9A", energy=50, genre="Minimal")
-    result = predict_transition_type(t1, t2)
-    assert result == "bass_swap"
-
-  def test_dnb_bass_swap(self):
-    """Drum & Bass mit guter Harmonie = bass_swap."""
-    t1 = _make_track(bpm=174.0, camelot="8A", energy=75, genre="Drum & Bass")
-    t2 = _make_track(bpm=174.0, camelot="9A", energy=70, genre="Drum & Bass")
-    result = predict_transition_type(t1, t2)
+  @pytest.mark.parametrize("genre,bpm1,energy1,bpm2,energy2", _BASS_SWAP_CASES)
+  def test_hard_genre_bass_swap(self, genre, bpm1, energy1, bpm2, energy2):
+    """Harte Genres mit guter Harmonie (8A -> 9A) = bass_swap."""
+    result = _predict_cached(
+      (bpm1, "8A", energy1, genre), (bpm2, "9A", energy2, genre)
+    )
     assert result == "bass_swap"
 
 
@@ -242,18 +254,18 @@ class TestModerateHarmony:
 
   def test_moderate_harmony_energy_diff(self):
     """Moderate Harmonie + Energie-Diff = breakdown_bridge."""
-    t1 = _make_track(bpm=128.0, camelot="8A", energy=40)
-    t2 = _make_track(bpm=129.0, camelot="3A", energy=70)
-    result = predict_transition_type(t1, t2)
+    result = _predict_cached(
+      (128.0, "8A", 40, "Unknown"), (129.0, "3A", 70, "Unknown")
+    )
     # Moderate harmony, energy diff > 15 -> breakdown_bridge
-    assert result in ("breakdown_bridge", "filter_ride", "echo_out")
+    assert result in _MODERATE_ENERGY_DIFF
 
   def test_moderate_harmony_similar_energy(self):
     """Moderate Harmonie + aehnliche Energie = filter_ride."""
-    t1 = _make_track(bpm=128.0, camelot="8A", energy=50)
-    t2 = _make_track(bpm=129.0, camelot="3A", energy=55)
-    result = predict_transition_type(t1, t2)
-    assert result in ("filter_ride", "smooth_blend", "breakdown_bridge")
+    result = _predict_cached(
+      (128.0, "8A", 50, "Unknown"), (129.0, "3A", 55, "Unknown")
+    )
+    assert result in _MODERATE_SIMILAR_ENERGY
 
 
 # === Cold Cut Tests ===
@@ -263,9 +275,9 @@ class TestColdCut:
 
   def test_incompatible_everything(self):
     """Komplett inkompatible Tracks = cold_cut."""
-    t1 = _make_track(bpm=128.0, camelot="8A", energy=50)
-    t2 = _make_track(bpm=90.0, camelot="1B", energy=50)
-    result = predict_transition_type(t1, t2, bpm_tolerance=3.0)
+    result = _predict_cached(
+      (128.0, "8A", 50, "Unknown"), (90.0, "1B", 50, "Unknown"), bpm_tolerance=3.0
+    )
     assert result == "cold_cut"
 
 
@@ -274,55 +286,15 @@ class TestColdCut:
 class TestTransitionEdgeCases:
   """Edge Cases fuer Transition Type Prediction."""
 
-  def test_zero_bpm_tracks(self):
-    """Tracks mit 0 BPM crashen nicht."""
-    t1 = _make_track(bpm=0.0)
-    t2 = _make_track(bpm=128.0)
-    result = predict_transition_type(t1, t2)
-    assert result in TRANSITION_TYPE_LABELS
+  @pytest.mark.parametrize("from_track,to_track", _EDGE_CASES)
+  def test_edge_case_does_not_crash(self, from_track, to_track):
+    """Grenzwerte liefern einen bekannten Transition-Typ statt zu crashen."""
+    assert _predict_cached(from_track, to_track) in TRANSITION_TYPE_LABELS
 
   def test_same_track(self):
     """Identischer Track = smooth_blend oder filter_ride."""
-    t = _make_track(bpm=128.0, camelot="8A", energy=50)
-    result = predict_transition_type(t, t)
-    assert result in ("smooth_blend", "filter_ride")
-
-  def test_no_genre(self):
-    """Tracks ohne Genre crashen nicht."""
-    t1 = _make_track(genre="")
-    t2 = _make_track(genre="")
-    result = predict_transition_type(t1, t2)
-    assert result in TRANSITION_TYPE_LABELS
-
-  def test_none_genre_attribute(self):
-    """Track mit None-Genre crasht nicht."""
-    t1 = _make_track()
-    t2 = _make_track()
-    t1.detected_genre = None
-    t2.detected_genre = None
-    result = predict_transition_type(t1, t2)
-    assert result in TRANSITION_TYPE_LABELS
-
-  def test_extreme_energy_values(self):
-    """Extreme Energy-Werte (0, 100) crashen nicht."""
-    t1 = _make_track(energy=0)
-    t2 = _make_track(energy=100)
-    result = predict_transition_type(t1, t2)
-    assert result in TRANSITION_TYPE_LABELS
-
-  def test_very_high_bpm(self):
-    """Sehr hohe BPM crashen nicht."""
-    t1 = _make_track(bpm=200.0)
-    t2 = _make_track(bpm=200.0)
-    result = predict_transition_type(t1, t2)
-    assert result in TRANSITION_TYPE_LABELS
-
-  def test_very_low_bpm(self):
-    """Sehr niedrige BPM crashen nicht."""
-    t1 = _make_track(bpm=60.0)
-    t2 = _make_track(bpm=60.0)
-    result = predict_transition_type(t1, t2)
-    assert result in TRANSITION_TYPE_LABELS
+    result = predict_transition_type(_DEFAULT_TRACK, _DEFAULT_TRACK)
+    assert result in _SAME_TRACK
 
   def test_custom_tolerance(self):
     """Benutzerdefinierte BPM-Toleranz wird respektiert."""
@@ -339,43 +311,79 @@ class TestTransitionEdgeCases:
 
 # === Integration: TransitionRecommendation beinhaltet transition_type ===
 
+# Ein Batch-Aufruf fuer alle Integrationstests. Recommendations sind paarweise
+# (Track i -> i+1); jedes Segment benennt seine eigenen Uebergaenge, die
+# Uebergaenge zwischen zwei Segmenten bleiben unbenannt.
+_RECOMMENDATION_SEGMENTS = [
+  (("basic",), [
+    _make_track(title="T1", bpm=128.0, camelot="8A", energy=50),
+    _make_track(title="T2", bpm=128.0, camelot="8A", energy=55),
+  ]),
+  (("tech_house",), [
+    _make_track(title="T1", bpm=128.0, camelot="8A", energy=50, genre="Tech House"),
+    _make_track(title="T2", bpm=128.0, camelot="9A", energy=55, genre="Tech House"),
+  ]),
+  (("energy_jump", "bpm_drop"), [
+    _make_track(title="T1", bpm=128.0, camelot="8A", energy=50),
+    _make_track(title="T2", bpm=128.0, camelot="8A", energy=80),
+    _make_track(title="T3", bpm=70.0, camelot="8A", energy=50),
+  ]),
+  (("halftime",), [
+    _make_track(title="T1", bpm=140.0, camelot="8A", energy=50),
+    _make_track(title="T2", bpm=70.0, camelot="8A", energy=50),
+  ]),
+]
+
+
+def _build_recommendation_batch(segments):
+  """Verkettet die Segmente; liefert (Tracks, Uebergangsname -> Recommendation-Index)."""
+  tracks = []
+  index = {}
+  for names, segment in segments:
+    start = len(tracks)
+    tracks.extend(segment)
+    for offset, name in enumerate(names):
+      index[name] = start + offset
+  return tracks, index
+
+
+_RECOMMENDATION_BATCH, _RECOMMENDATION_INDEX = _build_recommendation_batch(
+  _RECOMMENDATION_SEGMENTS
+)
+
+
+@pytest.fixture(scope="module")
+def batch_recs():
+  """Recommendations fuer _RECOMMENDATION_BATCH, einmal pro Modul berechnet."""
+  return compute_transition_recommendations(_RECOMMENDATION_BATCH, bpm_tolerance=6.0)
+
+
+@pytest.fixture(scope="module")
+def named_recs(batch_recs):
+  """Benannte Uebergaenge der Segmente -> Recommendation."""
+  return {name: batch_recs[i] for name, i in _RECOMMENDATION_INDEX.items()}
+
+
 class TestTransitionInRecommendation:
   """Prueft ob transition_type in den Recommendations gesetzt wird."""
 
-  def test_recommendation_has_transition_type(self):
-    from hpg_core.playlist import compute_transition_recommendations
-    t1 = _make_track(title="T1", bpm=128.0, camelot="8A", energy=50)
-    t2 = _make_track(title="T2", bpm=128.0, camelot="8A", energy=55)
-    recs = compute_transition_recommendations([t1, t2], bpm_tolerance=6.0)
-    assert len(recs) == 1
-    assert recs[0].transition_type in TRANSITION_TYPE_LABELS
+  def test_recommendation_has_transition_type(self, named_recs):
+    assert named_recs["basic"].transition_type in TRANSITION_TYPE_LABELS
 
-  def test_recommendation_type_not_default(self):
+  def test_recommendation_type_not_default(self, named_recs):
     """transition_type soll aktiv gesetzt werden, nicht nur default."""
-    from hpg_core.playlist import compute_transition_recommendations
-    t1 = _make_track(title="T1", bpm=128.0, camelot="8A", energy=50, genre="Tech House")
-    t2 = _make_track(title="T2", bpm=128.0, camelot="9A", energy=55, genre="Tech House")
-    recs = compute_transition_recommendations([t1, t2], bpm_tolerance=6.0)
-    assert len(recs) == 1
     # Tech House + gute Harmonie -> bass_swap (nicht default "blend")
-    assert recs[0].transition_type != "blend"
+    assert named_recs["tech_house"].transition_type != "blend"
 
-  def test_multiple_recommendations(self):
+  def test_multiple_recommendations(self, batch_recs, named_recs):
     """Mehrere Recommendations haben jeweils ihren eigenen Typ."""
-    from hpg_core.playlist import compute_transition_recommendations
-    t1 = _make_track(title="T1", bpm=128.0, camelot="8A", energy=50)
-    t2 = _make_track(title="T2", bpm=128.0, camelot="8A", energy=80)
-    t3 = _make_track(title="T3", bpm=70.0, camelot="8A", energy=50)
-    recs = compute_transition_recommendations([t1, t2, t3], bpm_tolerance=6.0)
-    assert len(recs) == 2
-    for rec in recs:
+    assert len(batch_recs) == len(_RECOMMENDATION_BATCH) - 1
+    for rec in batch_recs:
       assert rec.transition_type in TRANSITION_TYPE_LABELS
+    # Energie-Sprung 50 -> 80 und BPM-Sprung 128 -> 70 aus demselben Segment
+    assert named_recs["energy_jump"].transition_type in TRANSITION_TYPE_LABELS
+    assert named_recs["bpm_drop"].transition_type in TRANSITION_TYPE_LABELS
 
-  def test_halftime_in_recommendation(self):
+  def test_halftime_in_recommendation(self, named_recs):
     """Half-Time Transition wird in Recommendation korrekt gesetzt."""
-    from hpg_core.playlist import compute_transition_recommendations
-    t1 = _make_track(title="T1", bpm=140.0, camelot="8A", energy=50)
-    t2 = _make_track(title="T2", bpm=70.0, camelot="8A", energy=50)
-    recs = compute_transition_recommendations([t1, t2], bpm_tolerance=6.0)
-    assert len(recs) == 1
-    assert recs[0].transition_type == "halftime_switch"
+    assert named_recs["halftime"].transition_type == "halftime_switch"